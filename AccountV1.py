@@ -1,5 +1,6 @@
 import sqlite3
-import hashlib
+
+from passwords import hash_password, check_password
 
 def setup_database():
     conn = sqlite3.connect("userdata.db")
@@ -15,9 +16,6 @@ def setup_database():
     conn.commit()
     conn.close()
     
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
-
 def register ():
     conn = sqlite3.connect("userdata.db")
     cursor = conn.cursor()
@@ -52,9 +50,15 @@ def login():
     
     cursor.execute("SELECT password FROM userdata WHERE username = ?", (username,))
     result = cursor.fetchone()
+    ok, upgraded = check_password(password, result[0]) if result else (False, None)
+    if upgraded:
+        # legacy SHA-256 hash: store the salted hash now that we know the password
+        cursor.execute("UPDATE userdata SET password = ? WHERE username = ? AND password = ?",
+                       (upgraded, username, result[0]))
+        conn.commit()
     conn.close()
     
-    if result and result[0] == hash_password(password):
+    if ok:
         print(f"Login successful! Welcome, {username}!")
         return username
     else:
@@ -1,55 +1,21 @@
-import sqlite3
-import hashlib
+from datastore import get_store
+from passwords import hash_password, check_password
+from friend_cache import FriendGraph
+from friend_suggestions import SuggestionIndex
+from social import SocialRepository
 
 # ------------------ Database Setup ------------------ #
 DB_FILE = "appdata.db"
+db = get_store(DB_FILE)
+social = SocialRepository(db)
 
 def setup_database():
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
-
-    # Accounts table
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS userdata (
-        id INTEGER PRIMARY KEY,
-        username VARCHAR(255) UNIQUE NOT NULL,
-        password CHAR(64) NOT NULL
-    )
-    """)
-
-    # Friends table
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS friends (
-        id INTEGER PRIMARY KEY,
-        user_id INTEGER NOT NULL,
-        friend_id INTEGER NOT NULL,
-        status TEXT NOT NULL CHECK(status IN ('pending','accepted')),
-        FOREIGN KEY(user_id) REFERENCES userdata(id),
-        FOREIGN KEY(friend_id) REFERENCES userdata(id)
-    )
-    """)
-
-    conn.commit()
-    conn.close()
-
-
-# ------------------ Utility ------------------ #
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
-
-def get_user_id(username):
-    conn = sqlite3.connect("appdata.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM userdata WHERE username = ?", (username,))
-    result = cursor.fetchone()
-    conn.close()
-    return result[0] if result else None
+    # creates the schema and migrates older friends data (see migrations.py)
+    social.setup()
+
 
 # ------------------ Authentication ------------------ #
 def register():
-    conn = sqlite3.connect(DB_FILE)   # use the same file everywhere
-    cursor = conn.cursor()
-
     while True:
         username = input("Choose a username: ").strip()
         password = input("Choose a password: ").strip()
@@ -59,31 +25,23 @@ def register():
             print("Passwords do not match. Try again.")
             continue
 
-        try:
-            cursor.execute(
-                "INSERT INTO userdata (username, password) VALUES (?, ?)", 
-                (username, hash_password(password))  # hash password!
-            )
-            conn.commit()
+        if social.create_user(username, hash_password(password)):  # hash password!
             print(f"User '{username}' registered successfully! Welcome {username}!")
-            conn.close()
             return username
-        except sqlite3.IntegrityError:
-            print("That username is already taken. Please try another.")
+        print("That username is already taken. Please try another.")
 
 
 def login():
-    conn = sqlite3.connect("appdata.db")
-    cursor = conn.cursor()
-
     username = input("Enter username: ").strip()
     password = input("Enter password: ").strip()
 
-    cursor.execute("SELECT password FROM userdata WHERE username = ?", (username,))
-    result = cursor.fetchone()
-    conn.close()
+    stored = social.password_hash(username)
+    ok, upgraded = check_password(password, stored) if stored else (False, None)
+    if upgraded:
+        # legacy SHA-256 hash: store the salted hash now that we know the password
+        social.replace_password_hash(username, stored, upgraded)
 
-    if result and result[0] == hash_password(password):
+    if ok:
         print(f"Login successful! Welcome, {username}!")
         return username
     else:
@@ -108,273 +66,246 @@ def main_menu(username):
             print("Invalid option.")
 
 # ------------------ Friends System ------------------ #
-def count_requests(user_id):
-    conn = sqlite3.connect("appdata.db")
-    cursor = conn.cursor()
+# accepted friendships by username; kept in step by the functions below so
+# the suggestions stay current while the friends menu is open
+friend_graph = FriendGraph(social.friends)
+suggestions = None
 
-    cursor.execute("SELECT COUNT(*) FROM friends WHERE friend_id = ? AND status = 'pending'", (user_id,))
-    incoming = cursor.fetchone()[0]
+def get_suggestions(username):
+    global suggestions
+    if suggestions is None or suggestions.user != username:
+        if suggestions is not None:
+            suggestions.close()
+        suggestions = SuggestionIndex(friend_graph, username)
+    return suggestions
 
-    cursor.execute("SELECT COUNT(*) FROM friends WHERE user_id = ? AND status = 'pending'", (user_id,))
-    outgoing = cursor.fetchone()[0]
-
-    conn.close()
-    return incoming, outgoing
+def count_requests(username):
+    return social.request_counts(username)
 
 
 def friends_menu(username):
-    user_id = get_user_id(username)
+    global suggestions
+    # start from what is in the database now
+    if suggestions is not None:
+        suggestions.close()
+        suggestions = None
+    friend_graph.clear()
 
     while True:
         print("\n--- Friends Menu ---")
-        view_friends(user_id)
+        view_friends(username)
 
-        incoming_count, outgoing_count = count_requests(user_id)
+        incoming_count, outgoing_count = count_requests(username)
         print(f"1. View Friend Requests ({incoming_count})")
         print(f"2. View Outgoing Requests ({outgoing_count})")
         print("3. Add Friend")
         print("4. Remove Friend")
+        print("5. People You May Know")
         print("q. Main Menu")
 
         choice = input("Choose an option: ").strip()
 
         if choice == "1":
-            view_requests(user_id)
+            view_requests(username)
         elif choice == "2":
-            view_outgoing(user_id)
+            view_outgoing(username)
         elif choice == "3":
-            add_friend(user_id)
+            add_friend(username)
         elif choice == "4":
-            remove_friend(user_id)
+            remove_friend(username)
+        elif choice == "5":
+            suggest_friends(username)
         elif choice.lower() == "q":
             break
         else:
             print("Invalid option.")
 
 
-def view_friends(user_id):
-    conn = sqlite3.connect("appdata.db")
-    cursor = conn.cursor()
-
-    cursor.execute("""
-    SELECT u.username
-    FROM friends f
-    JOIN userdata u ON (u.id = f.user_id OR u.id = f.friend_id)
-    WHERE (f.user_id = ? OR f.friend_id = ?)
-      AND f.status = 'accepted'
-      AND u.id != ?
-    """, (user_id, user_id, user_id))
-
-    friends = cursor.fetchall()
-    conn.close()
+def view_friends(username):
+    friends = social.friends(username)
 
     if friends:
         print("Your friends:")
         for friend in friends:
-            print(f" - {friend[0]}")
+            print(f" - {friend}")
     else:
         print("No friends yet.")
 
 
-def view_requests(user_id):
-    conn = sqlite3.connect("appdata.db")
-    cursor = conn.cursor()
+def view_requests(username):
+    # show the list, handle one request, then show the refreshed list
+    while True:
+        requests = social.incoming_requests(username)
 
-    cursor.execute("""
-        SELECT u.username 
-        FROM friends f
-        JOIN userdata u ON f.user_id = u.id
-        WHERE f.friend_id = ? AND f.status = 'pending'
-    """, (user_id,))
-    requests = cursor.fetchall()
-    conn.close()
+        if not requests:
+            print("\nNo incoming friend requests.")
+            return
 
-    if not requests:
-        print("\nNo incoming friend requests.")
-        return
+        print("\n--- Incoming Friend Requests ---")
+        for i, sender in enumerate(requests, start=1):
+            print(f"{i}. {sender}")
+
+        if not handle_one_request(username, requests):
+            return
+
+
+def parse_usernames(choice, everyone):
+    # "all", or one or more comma-separated usernames
+    if choice.lower() == "all":
+        return list(everyone)
+    return [name.strip() for name in choice.split(",") if name.strip()]
 
-    print("\n--- Incoming Friend Requests ---")
-    for i, (username,) in enumerate(requests, start=1):
-        print(f"{i}. {username}")
 
+def handle_one_request(username, requests):
+    # -> True once request(s) were accepted/declined, False on 'b'
     while True:
-        choice = input("\nType a username to Accept/Decline, or 'b' to go back: ").strip()
+        choice = input("\nType a username (several: comma-separated, or 'all') to Accept/Decline, or 'b' to go back: ").strip()
         
         if choice.lower() == "b":
-            break
+            return False
 
-        # check if username is in requests
-        valid_usernames = [u[0] for u in requests]
-        if choice not in valid_usernames:
+        # check the usernames are in requests
+        chosen = parse_usernames(choice, requests)
+        if not chosen or any(name not in requests for name in chosen):
             print("Invalid username. Please type exactly as shown.")
             continue
+        who = chosen[0] if len(chosen) == 1 else f"{len(chosen)} requests"
 
-        action = input(f"Do you want to (a)ccept or (d)ecline {choice}? ").strip().lower()
+        action = input(f"Do you want to (a)ccept or (d)ecline {who}? ").strip().lower()
         if action not in ["a", "d"]:
             print("Invalid option. Type 'a' for accept or 'd' for decline.")
             continue
 
-        confirm = input(f"Are you sure you want to {'ACCEPT' if action == 'a' else 'DECLINE'} {choice}? (y/n): ").strip().lower()
+        confirm = input(f"Are you sure you want to {'ACCEPT' if action == 'a' else 'DECLINE'} {who}? (y/n): ").strip().lower()
         if confirm != "y":
             print("Cancelled.")
             continue
 
-        conn = sqlite3.connect("appdata.db")
-        cursor = conn.cursor()
-
-        if action == "a":
-            cursor.execute("""
-                UPDATE friends 
-                SET status = 'accepted'
-                WHERE user_id = (SELECT id FROM userdata WHERE username = ?)
-                AND friend_id = ?
-                AND status = 'pending'
-            """, (choice, user_id))
-            print(f"You are now friends with {choice}!")
-
-        elif action == "d":
-            cursor.execute("""
-                DELETE FROM friends 
-                WHERE user_id = (SELECT id FROM userdata WHERE username = ?)
-                AND friend_id = ?
-                AND status = 'pending'
-            """, (choice, user_id))
-            print(f"You declined the request from {choice}.")
-
-        conn.commit()
-        conn.close()
-
-        # refresh the list after action
-        return view_requests(user_id)
-
-
-
-def view_outgoing(user_id):
-    conn = sqlite3.connect("appdata.db")
-    cursor = conn.cursor()
-
-    cursor.execute("""
-    SELECT u.username 
-    FROM friends f
-    JOIN userdata u ON f.friend_id = u.id
-    WHERE f.user_id = ? AND f.status = 'pending'
-    """, (user_id,))
-
-    outgoing = cursor.fetchall()
-    conn.close()
-
-    if outgoing:
-        print("Outgoing friend requests:")
-        for uname in outgoing:
-            uname = uname[0]
-            confirm = input(f"Cancel friend request to {uname}? (y/n/skip): ").strip().lower()
-            if confirm == "y":
-                cancel_request(user_id, uname)
-    else:
-        print("No outgoing requests.")
+        if len(chosen) == 1:
+            handle_request(username, chosen[0], action == "a")
+        else:
+            handle_requests(username, chosen, action == "a")
+        return True
+
 
 
-def add_friend(user_id):
-    target = input("Enter username to add: ").strip()
-    target_id = get_user_id(target)
+def view_outgoing(username):
+    outgoing = social.outgoing_requests(username)
+
+    if not outgoing:
+        print("No outgoing requests.")
+        return
+
+    print("Outgoing friend requests:")
+    for uname in outgoing:
+        print(f" - {uname}")
+    choice = input("Type usernames to cancel (comma-separated, or 'all'), or 'b' to go back: ").strip()
+    if choice and choice.lower() != "b":
+        cancel_requests(username, parse_usernames(choice, outgoing))
+
+
+def add_friend(username):
+    target = input("Enter username to add (several: comma-separated): ").strip()
+
+    if "," in target:
+        targets = parse_usernames(target, ())
+        sent = social.send_requests(username, targets)
+        for name in targets:
+            if name in sent:
+                print(f"Friend request sent to {name}!")
+            else:
+                print(f"Skipped {name}: not found, yourself, or already connected/pending.")
+        return
 
-    if not target_id:
+    if not social.user_exists(target):
         print("User not found.")
         return
-    if target_id == user_id:
+    if target == username:
         print("You cannot add yourself.")
         return
 
-    conn = sqlite3.connect("appdata.db")
-    cursor = conn.cursor()
-
-    cursor.execute("""
-    SELECT status FROM friends 
-    WHERE (user_id = ? AND friend_id = ?) 
-       OR (user_id = ? AND friend_id = ?)
-    """, (user_id, target_id, target_id, user_id))
-
-    relation = cursor.fetchone()
-
-    if relation:
+    if social.are_friends(username, target) or social.has_request(username, target):
         print("You are already connected or request pending.")
-    else:
-        cursor.execute("""
-        INSERT INTO friends (user_id, friend_id, status)
-        VALUES (?, ?, 'pending')
-        """, (user_id, target_id))
-        conn.commit()
+    elif social.send_request(username, target):
         print(f"Friend request sent to {target}!")
-
-    conn.close()
+    else:
+        print("You are already connected or request pending.")
 
 
-def remove_friend(user_id):
+def remove_friend(username):
     target = input("Enter username to remove: ").strip()
-    target_id = get_user_id(target)
 
-    if not target_id:
+    if not social.user_exists(target):
         print("User not found.")
         return
 
-    conn = sqlite3.connect("appdata.db")
-    cursor = conn.cursor()
-
-    cursor.execute("""
-    DELETE FROM friends 
-    WHERE ((user_id = ? AND friend_id = ?) 
-        OR (user_id = ? AND friend_id = ?))
-      AND status = 'accepted'
-    """, (user_id, target_id, target_id, user_id))
-
-    if cursor.rowcount > 0:
+    if social.remove_friendship(username, target):
+        friend_graph.remove_edge(username, target)
         print(f"Removed {target} from your friends.")
     else:
         print("You are not friends with this user.")
 
-    conn.commit()
-    conn.close()
 
+def handle_request(username, from_username, accept):
+    if accept:
+        if social.accept_request(from_username, username):
+            friend_graph.add_edge(from_username, username)
+            print(f"You are now friends with {from_username}!")
+        else:
+            print(f"No pending request from {from_username} found.")
+    elif social.decline_request(from_username, username):
+        print(f"Declined friend request from {from_username}.")
+    else:
+        print(f"No pending request from {from_username} found.")
 
-def handle_request(user_id, from_username, accept):
-    from_id = get_user_id(from_username)
-    conn = sqlite3.connect("appdata.db")
-    cursor = conn.cursor()
 
+def handle_requests(username, from_usernames, accept):
+    # the whole batch in one transaction
     if accept:
-        cursor.execute("""
-        UPDATE friends SET status = 'accepted' 
-        WHERE user_id = ? AND friend_id = ? AND status = 'pending'
-        """, (from_id, user_id))
-        print(f"You are now friends with {from_username}!")
+        done = social.accept_requests(username, from_usernames)
+        for sender in done:
+            friend_graph.add_edge(sender, username)
+        if done:
+            print(f"You are now friends with {', '.join(done)}!")
     else:
-        cursor.execute("""
-        DELETE FROM friends 
-        WHERE user_id = ? AND friend_id = ? AND status = 'pending'
-        """, (from_id, user_id))
-        print(f"Declined friend request from {from_username}.")
+        done = social.decline_requests(username, from_usernames)
+        if done:
+            print(f"Declined friend requests from {', '.join(done)}.")
+    for from_username in from_usernames:
+        if from_username not in done:
+            print(f"No pending request from {from_username} found.")
 
-    conn.commit()
-    conn.close()
 
+def suggest_friends(username):
+    # friends of friends, most mutual friends first; skips pending requests
+    pending = social.outgoing_requests(username) + social.incoming_requests(username)
+    top = get_suggestions(username).top(10, exclude=pending)
 
-def cancel_request(user_id, to_username):
-    to_id = get_user_id(to_username)
-    conn = sqlite3.connect("appdata.db")
-    cursor = conn.cursor()
+    if not top:
+        print("\nNo suggestions yet. Add some friends first!")
+        return
 
-    cursor.execute("""
-    DELETE FROM friends 
-    WHERE user_id = ? AND friend_id = ? AND status = 'pending'
-    """, (user_id, to_id))
+    print("\n--- People You May Know ---")
+    for i, (name, mutual) in enumerate(top, start=1):
+        print(f"{i}. {name} ({mutual} mutual friend{'s' if mutual != 1 else ''})")
 
-    if cursor.rowcount > 0:
-        print(f"Cancelled request to {to_username}.")
+    choice = input("\nType a number to send a friend request, or 'b' to go back: ").strip()
+    if not choice.isdigit() or not 1 <= int(choice) <= len(top):
+        return
+    target = top[int(choice) - 1][0]
+    if social.send_request(username, target):
+        print(f"Friend request sent to {target}!")
     else:
-        print("No such request found.")
+        print("You are already connected or request pending.")
 
-    conn.commit()
-    conn.close()
+
+def cancel_requests(username, to_usernames):
+    cancelled = social.cancel_requests(username, to_usernames)
+    for to_username in to_usernames:
+        if to_username in cancelled:
+            print(f"Cancelled request to {to_username}.")
+        else:
+            print(f"No request to {to_username} found.")
 
 
 # ------------------ Main ------------------ #
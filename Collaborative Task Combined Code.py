@@ -1,227 +1,203 @@
-import sqlite3
-import hashlib
 import pygame
 import sys
-import requests
-import threading
-import json
 import os
 import tkinter as tk
 from tkinter import filedialog
 
+from datastore import get_store
+from friend_cache import RequestCache, FriendGraph, FriendPager
+from friend_suggestions import SuggestionIndex
+from social import SocialRepository
+from render_scheduler import RenderScheduler
+from text_cache import render_text
+from text_layout import TextLayout
+from ollama_client import OllamaClient, OllamaError, StreamHandle
+from answer_cache import AnswerCache
+from ai_worker import AIWorker
+from plant_repository import PlantRepository
+from snapshot_writer import SnapshotWriter
+from plant_import import import_plants
+from plant_sync import PlantSync
+from virtual_list import VirtualList
+from ui_layout import Layout
+from thumbnails import ThumbnailService
+from passwords import hash_password, check_password, AuthWorker
+
 # Database
 DB_FILE = "appdata.db"
 PLANTS_JSON = "plants.json"
+db = get_store(DB_FILE)
+request_cache = RequestCache()
+plant_repo = PlantRepository(db)
+plant_sync = PlantSync(db, PLANTS_JSON)
+snapshot_writer = SnapshotWriter(PLANTS_JSON, lambda: plant_sync.export_rows(plant_repo.export_rows),
+                                 on_written=plant_sync.record_export)
+
+social = SocialRepository(db)
 
 def setup_database():
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
-    cur.execute("""CREATE TABLE IF NOT EXISTS userdata(
-        id INTEGER PRIMARY KEY,
-        username TEXT UNIQUE NOT NULL,
-        password TEXT NOT NULL
-    )""")
-    cur.execute("""CREATE TABLE IF NOT EXISTS friends(
-        user1 TEXT NOT NULL, user2 TEXT NOT NULL,
-        UNIQUE(user1, user2)
-    )""")
-    cur.execute("""CREATE TABLE IF NOT EXISTS requests(
-        sender TEXT, receiver TEXT,
-        UNIQUE(sender, receiver)
-    )""")
-    # Plants table
-    cur.execute("""CREATE TABLE IF NOT EXISTS plants(
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT,
-        age TEXT,
-        shade INTEGER,
-        notes TEXT,
-        photo TEXT,
-        archived INTEGER DEFAULT 0,
-        source_json INTEGER DEFAULT 0,
-        UNIQUE(name, notes) -- naive uniqueness to avoid duplicates from import
-    )""")
-    conn.commit()
-    conn.close()
-
-def hash_pw(p): return hashlib.sha256(p.encode()).hexdigest()
+    # accounts/friends schema and migrations (each batch is its own transaction)
+    social.setup()
+    with db.transaction():
+        # Plants table (+ JSON sync bookkeeping)
+        plant_repo.setup()
+        plant_sync.setup()
+
+def hash_pw(p): return hash_password(p)
 
 def validate_login(u, p):
-    c=sqlite3.connect(DB_FILE); cur=c.cursor()
-    cur.execute("SELECT password FROM userdata WHERE username=?",(u,))
-    r=cur.fetchone(); c.close()
-    return r and r[0]==hash_pw(p)
+    stored=social.password_hash(u)
+    if stored is None: return False
+    ok, upgraded = check_password(p, stored)
+    if upgraded:
+        # old unsalted/weaker hash: store the current format now that we know the password
+        social.replace_password_hash(u, stored, upgraded)
+    return ok
 
 def try_register(u, p):
-    try:
-        c=sqlite3.connect(DB_FILE); cur=c.cursor()
-        cur.execute("INSERT INTO userdata(username,password) VALUES(?,?)",(u,hash_pw(p)))
-        c.commit(); c.close(); return True
-    except: return False
+    return social.create_user(u, hash_pw(p))
+
+def user_exists(u):
+    return social.user_exists(u)
 
 def get_friends(user):
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT user2 FROM friends WHERE user1=? 
-        UNION 
-        SELECT user1 FROM friends WHERE user2=?
-    """, (user, user))
-    rows = [row[0] for row in cur.fetchall()]
-    conn.close()
-    return rows
+    return social.friends(user)
+
+friend_graph = FriendGraph(get_friends)
+friend_pager = FriendPager(social.friends_page, social.count_friends)
 
 def add_friend(user1, user2):
-    if user1 == user2:
-        return False
-    a, b = sorted([user1, user2])
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
-    try:
-        cur.execute("INSERT INTO friends (user1, user2) VALUES (?, ?)", (a, b))
-        conn.commit()
-        conn.close()
-        return True
-    except sqlite3.IntegrityError:
-        conn.close()
+    if not social.add_friendship(user1, user2):
         return False
+    friend_graph.add_edge(user1, user2)
+    return True
 
 
 def send_request(sender, receiver):
-    if sender==receiver: return False
-    c=sqlite3.connect(DB_FILE); cur=c.cursor()
-    try:
-        cur.execute("INSERT INTO requests VALUES(?,?)",(sender,receiver))
-        c.commit(); c.close(); return True
-    except: c.close(); return False
+    if not social.send_request(sender, receiver): return False
+    request_cache.request_added(sender, receiver)
+    return True
 
 def accept_request(sender, receiver):
-    c = sqlite3.connect(DB_FILE); cur = c.cursor()
-    cur.execute("DELETE FROM requests WHERE sender=? AND receiver=?", (sender, receiver))
-    a, b = sorted([sender, receiver])
-    cur.execute("INSERT OR IGNORE INTO friends VALUES(?,?)", (a, b))
-    c.commit(); c.close()
+    if social.accept_request(sender, receiver):
+        friend_graph.add_edge(sender, receiver)
+    request_cache.request_removed(sender, receiver)
 
 
 def decline_request(sender, receiver):
-    c=sqlite3.connect(DB_FILE); cur=c.cursor()
-    cur.execute("DELETE FROM requests WHERE sender=? AND receiver=?",(sender,receiver))
-    c.commit(); c.close()
+    social.decline_request(sender, receiver)
+    request_cache.request_removed(sender, receiver)
 
 def cancel_request(sender, receiver):
-    c=sqlite3.connect(DB_FILE); cur=c.cursor()
-    cur.execute("DELETE FROM requests WHERE sender=? AND receiver=?",(sender,receiver))
-    c.commit(); c.close()
+    social.cancel_request(sender, receiver)
+    request_cache.request_removed(sender, receiver)
+
+# batch versions: one transaction for the whole list
+def send_requests(sender, receivers):
+    sent = social.send_requests(sender, receivers)
+    for receiver in sent:
+        request_cache.request_added(sender, receiver)
+    return sent
+
+def accept_requests(receiver, senders):
+    for sender in social.accept_requests(receiver, senders):
+        friend_graph.add_edge(sender, receiver)
+    for sender in senders:
+        request_cache.request_removed(sender, receiver)
+
+def decline_requests(receiver, senders):
+    social.decline_requests(receiver, senders)
+    for sender in senders:
+        request_cache.request_removed(sender, receiver)
+
+def cancel_requests(sender, receivers):
+    social.cancel_requests(sender, receivers)
+    for receiver in receivers:
+        request_cache.request_removed(sender, receiver)
 
 def get_incoming_requests(user):
-    c=sqlite3.connect(DB_FILE); cur=c.cursor()
-    cur.execute("SELECT sender FROM requests WHERE receiver=?",(user,))
-    rows=[r[0] for r in cur.fetchall()]
-    c.close(); return rows
+    return social.incoming_requests(user)
 
 def get_outgoing_requests(user):
-    c=sqlite3.connect(DB_FILE); cur=c.cursor()
-    cur.execute("SELECT receiver FROM requests WHERE sender=?",(user,))
-    rows=[r[0] for r in cur.fetchall()]
-    c.close(); return rows
+    return social.outgoing_requests(user)
+
+def load_request_cache(user):
+    request_cache.load(user, get_incoming_requests(user), get_outgoing_requests(user))
+
+# "People you may know" for the logged-in user, built on first use and then
+# updated by the friend graph as friendships change
+suggestions = None
+
+def get_suggestions(user):
+    global suggestions
+    if suggestions is None or suggestions.user != user:
+        reset_social_caches()
+        suggestions = SuggestionIndex(friend_graph, user)
+    return suggestions
+
+def reset_social_caches():
+    # on login/logout: re-read friendships (another program may have changed them)
+    global suggestions
+    if suggestions is not None: suggestions.close(); suggestions = None
+    friend_graph.clear()
 
 def remove_friend(u1,u2):
-    c=sqlite3.connect(DB_FILE); cur=c.cursor()
-    cur.execute("DELETE FROM friends WHERE (user1=? AND user2=?) OR (user1=? AND user2=?)",(u1,u2,u2,u1))
-    c.commit(); c.close()
+    if social.remove_friendship(u1,u2):
+        friend_graph.remove_edge(u1, u2)
 
 # Ollama (AI)
 MODEL_NAME = "llama3"
-
-def query_ollama(prompt: str, model: str = MODEL_NAME) -> str:
+ollama = OllamaClient()
+answer_cache = AnswerCache(db)
+answer_cache.purge_expired()
+
+def query_ollama(prompt: str, model: str = MODEL_NAME, on_token=None, cancelled=None) -> str:
+    # on_token(token) is called for each streamed token as it arrives;
+    # cancelled (from AIWorker) aborts the stream the moment the question is
+    # superseded, even before the first token (answer not cached)
+    output = ""
+    handle = StreamHandle()
+    if cancelled: cancelled.on_cancel(handle.abort)
     try:
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={"model": model, "prompt": prompt},
-            timeout=60,
-            stream=True
-        )
-        if response.status_code != 200:
-            return f"Error {response.status_code}: {response.text[:200]}"
-        output = ""
-        for line in response.iter_lines():
-            if line:
-                try:
-                    data = line.decode("utf-8")
-                    if '"response":' in data:
-                        part = data.split('"response":"')[1].split('"')[0]
-                        output += part
-                except Exception:
-                    pass
-        return output.strip() if output else "No response."
-    except Exception as e:
-        return f"Ollama error: {e}"
+        for token in ollama.stream(prompt, model, handle):
+            if cancelled and cancelled():
+                return output
+            output += token
+            if on_token: on_token(token)
+    except OllamaError as e:
+        return str(e)
+    if cancelled and cancelled():
+        return output
+    if not output.strip():
+        return "No response."
+    answer_cache.put(prompt, model, output.strip())
+    return output.strip()
 
 # Plants persistence
 
-# Plants in-memory list
-plants = []
-
-def load_plants_from_json():
-    global plants
-    if os.path.exists(PLANTS_JSON):
-        with open(PLANTS_JSON, "r") as f:
-            try:
-                plants = json.load(f)
-            except Exception:
-                plants = []
-    else:
-        plants = []
-    # ensure fields
-    for p in plants:
-        if "archived" not in p: p["archived"] = False
-        if "photo" not in p: p["photo"] = None
-
 def save_plants_to_json():
-    with open(PLANTS_JSON, "w") as f:
-        json.dump(plants, f, indent=2)
+    # queued for the background writer; edits in quick succession share one write
+    snapshot_writer.mark_dirty()
 
 def import_json_plants_to_db():
-    # Insert plants from JSON into DB if not already present
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
-    for p in plants:
-        try:
-            cur.execute("INSERT OR IGNORE INTO plants(name,age,shade,notes,photo,archived,source_json) VALUES(?,?,?,?,?,?,1)",
-                        (p.get('name'), p.get('age'), 1 if p.get('shade') else 0, p.get('notes'), p.get('photo'), 1 if p.get('archived') else 0))
-        except Exception:
-            pass
-    conn.commit(); conn.close()
+    # Stream plants from JSON into the DB (rows already present are skipped)
+    if not os.path.exists(PLANTS_JSON):
+        return None
+    try:
+        stats = import_plants(db, PLANTS_JSON)
+    except (ValueError, OSError) as e:
+        # keep the unreadable file around instead of overwriting it on the next save
+        print(f"Could not read {PLANTS_JSON} ({e}); moved it to {PLANTS_JSON}.corrupt")
+        os.replace(PLANTS_JSON, PLANTS_JSON + ".corrupt")
+        return None
+    plant_sync.record_import()
+    if stats.inserted or stats.failed:
+        print(f"Imported {PLANTS_JSON}: {stats}")
+    return stats
 
 def refresh_plants_from_db():
-    global plants
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
-    cur.execute("SELECT id,name,age,shade,notes,photo,archived FROM plants ORDER BY id DESC")
-    rows = cur.fetchall()
-    conn.close()
-    # convert to dict list for UI convenience
-    plants = []
-    for r in rows:
-        plants.append({
-            'id': r[0], 'name': r[1] or "", 'age': r[2] or "", 'shade': bool(r[3]), 'notes': r[4] or "", 'photo': r[5], 'archived': bool(r[6])
-        })
-
-def save_plant_to_db(plant, plant_id=None):
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
-    if plant_id is None:
-        cur.execute("INSERT INTO plants(name,age,shade,notes,photo,archived,source_json) VALUES(?,?,?,?,?,?,0)",
-                    (plant.get('name'), plant.get('age'), 1 if plant.get('shade') else 0, plant.get('notes'), plant.get('photo'), 1 if plant.get('archived') else 0))
-    else:
-        cur.execute("UPDATE plants SET name=?,age=?,shade=?,notes=?,photo=?,archived=?,source_json=0 WHERE id=?",
-                    (plant.get('name'), plant.get('age'), 1 if plant.get('shade') else 0, plant.get('notes'), plant.get('photo'), 1 if plant.get('archived') else 0, plant_id))
-    conn.commit(); conn.close()
-
-def delete_plant_from_db(plant_id):
-    conn = sqlite3.connect(DB_FILE); cur=conn.cursor()
-    cur.execute("DELETE FROM plants WHERE id=?",(plant_id,))
-    conn.commit(); conn.close()
+    # full reload; edits go through plant_repo.add/update/delete instead
+    plant_repo.load()
 
 # Pygame UI
 pygame.init()
@@ -230,28 +206,33 @@ screen = pygame.display.set_mode((WIDTH, HEIGHT))
 FONT = pygame.font.SysFont(None, 20)
 SMLFONT = pygame.font.SysFont(None, 16)
 checklist_area = pygame.Rect(20, 100, 320, 400)
+scheduler = RenderScheduler(fps=60)
+thumbnails = ThumbnailService(wake=scheduler.wake)
+auth_worker = AuthWorker(wake=scheduler.wake)
 
 class InputBox:
     def __init__(self,x,y,w,h,password=False):
         self.rect=pygame.Rect(x,y,w,h); self.text=""; self.active=False; self.password=password
-        self.txt_surface=FONT.render("",True,pygame.Color("black"))
+        self.txt_surface=render_text(FONT,"",True,pygame.Color("black"))
     def handle_event(self,e):
         if e.type==pygame.MOUSEBUTTONDOWN: self.active=self.rect.collidepoint(e.pos)
         if e.type==pygame.KEYDOWN and self.active:
             if e.key==pygame.K_BACKSPACE: self.text=self.text[:-1]
             elif e.key!=pygame.K_RETURN: self.text+=e.unicode
-            self.txt_surface=FONT.render("*"*len(self.text) if self.password else self.text,True,pygame.Color("black"))
+            self.txt_surface=render_text(FONT,"*"*len(self.text) if self.password else self.text,True,pygame.Color("black"))
     def draw(self,sc): 
         pygame.draw.rect(sc,pygame.Color("black"),self.rect,2)
         sc.blit(self.txt_surface,(self.rect.x+5,self.rect.y+8))
+        scheduler.track(("input",)+tuple(self.rect),self.rect,self.text)
 
 class Button:
     def __init__(self,text,x,y,w,h,action=None,color=(0,128,0)):
         self.rect=pygame.Rect(x,y,w,h); self.text=text; self.action=action; self.color=color
     def draw(self,sc):
         pygame.draw.rect(sc,self.color,self.rect,border_radius=6)
-        lab=FONT.render(self.text,True,pygame.Color("white"))
+        lab=render_text(FONT,self.text,True,pygame.Color("white"))
         sc.blit(lab,(self.rect.x+(self.rect.w-lab.get_width())//2,self.rect.y+(self.rect.h-lab.get_height())//2))
+        scheduler.track(("button",)+tuple(self.rect),self.rect,(self.text,self.color))
     def handle_event(self,e):
         if e.type==pygame.MOUSEBUTTONDOWN and self.rect.collidepoint(e.pos):
             if self.action:self.action()
@@ -259,7 +240,8 @@ class Button:
 # Global State
 setup_database()
 current_screen="home"; current_user=None; message=""; login_warning=None; warning_timer=0
-friend_page=0; pending_remove=None
+pending_remove=None
+selected_requests=set()  # ticked rows on the incoming/outgoing request screens
 
 # Checklist items
 checklist_items = [
@@ -273,62 +255,93 @@ item_height = 45
 editing_index = None  # which item is being edited
 text_input = ""
 
+def build_checklist_layout(layout):
+    # one row per task (checkbox, text, delete) plus the add button;
+    # only rebuilt when the number of tasks changes
+    rows = []
+    for i in range(len(checklist_items)):
+        y = checklist_area.y + 10 + i * item_height
+        box = layout.node((checklist_area.x + 10, y, checkbox_size, checkbox_size), ("toggle", i))
+        text = layout.node((box.rect.right + 10, y, 200, checkbox_size), ("edit", i))
+        delete = layout.node((checklist_area.right - 35, y, 25, 25), ("delete", i))
+        rows.append(layout.node((checklist_area.x, y, checklist_area.w, item_height), None, (box, text, delete)))
+    add = layout.node((checklist_area.x + 10, checklist_area.y + 10 + len(checklist_items) * item_height, 120, 30), ("add",))
+    return layout.node(checklist_area, None, rows + [add])
+
+checklist_layout = Layout(build_checklist_layout)
+
 # Navigation
 def go_home(): 
     global current_screen,message
     current_screen="home"; message=""
 def go_login():
     global current_screen; current_screen="login"; login_user.text=login_pass.text=""; 
-    login_user.txt_surface=login_pass.txt_surface=FONT.render("",True,pygame.Color("black"))
+    login_user.txt_surface=login_pass.txt_surface=render_text(FONT,"",True,pygame.Color("black"))
 def go_register():
     global current_screen; current_screen="register"
-    for b in [reg_user,reg_pass,reg_conf]: b.text=""; b.txt_surface=FONT.render("",True,pygame.Color("black"))
+    for b in [reg_user,reg_pass,reg_conf]: b.text=""; b.txt_surface=render_text(FONT,"",True,pygame.Color("black"))
 def go_account(): 
     global current_screen; current_screen="account"
 def go_friends():
     global current_screen; current_screen="friends"
+    if current_user: load_request_cache(current_user)
 def go_add_friend(): 
-    global current_screen; current_screen="friends_add"; add_box.text=""; add_box.txt_surface=FONT.render("",True,pygame.Color("black"))
+    global current_screen; current_screen="friends_add"; add_box.text=""; add_box.txt_surface=render_text(FONT,"",True,pygame.Color("black"))
 def go_remove_friend(): 
-    global current_screen; current_screen="friends_remove"; rem_box.text=""; rem_box.txt_surface=FONT.render("",True,pygame.Color("black"))
+    global current_screen; current_screen="friends_remove"; rem_box.text=""; rem_box.txt_surface=render_text(FONT,"",True,pygame.Color("black"))
 def go_incoming(): 
-    global current_screen; current_screen="friends_incoming"
+    global current_screen; current_screen="friends_incoming"; selected_requests.clear()
 def go_outgoing(): 
-    global current_screen; current_screen="friends_outgoing"
+    global current_screen; current_screen="friends_outgoing"; selected_requests.clear()
+def go_suggestions():
+    global current_screen; current_screen="friends_suggest"
 
 def go_plants():
     global current_screen
-    refresh_plants_from_db()
     current_screen = "plants"
 
 # Actions
-def do_login():
+# Password hashing is slow on purpose, so login/register run on auth_worker
+# and finish in finish_auth() once the result is back on the UI thread.
+def finish_auth(u, ok, error):
     global current_user,message
-    if validate_login(login_user.text,login_pass.text): current_user=login_user.text; go_home()
-    else: message="Invalid login"
+    if ok: current_user=u; reset_social_caches(); load_request_cache(current_user); go_home()
+    else: message=error
+
+def do_login():
+    global message
+    if auth_worker.busy(): return
+    u=login_user.text; message="Logging in..."
+    auth_worker.submit(validate_login, u, login_pass.text, on_done=lambda ok: finish_auth(u, ok, "Invalid login"))
 
 def do_register():
-    global current_user,message
+    global message
     if reg_pass.text!=reg_conf.text: message="Passwords do not match"; return
-    if try_register(reg_user.text,reg_pass.text): current_user=reg_user.text; go_home()
-    else: message="Username exists"
+    if auth_worker.busy(): return
+    u=reg_user.text; message="Registering..."
+    auth_worker.submit(try_register, u, reg_pass.text, on_done=lambda ok: finish_auth(u, ok, "Username exists"))
 
 def do_logout(): 
-    global current_user; current_user=None; go_home()
+    global current_user; current_user=None; request_cache.clear(); reset_social_caches(); go_home()
 def do_add_friend():
     global message
     target = add_box.text.strip()
     if not target:
         message = "Enter a username"
         return
-    c = sqlite3.connect(DB_FILE)
-    cur = c.cursor()
-    cur.execute("SELECT 1 FROM userdata WHERE username=?", (target,))
-    exists = cur.fetchone()
-    c.close()
-    if not exists:
+    if "," in target:
+        # several usernames: send them all in one go
+        names = [t.strip() for t in target.split(",") if t.strip()]
+        sent = send_requests(current_user, names)
+        message = f"Sent {len(sent)} of {len(names)} requests"
+        go_friends()
+        return
+    if not user_exists(target):
         message = "User does not exist"
         return
+    if friend_graph.are_friends(current_user, target):
+        message = "Already friends"
+        return
 
     if send_request(current_user, target):
         message = "Request sent"
@@ -337,8 +350,26 @@ def do_add_friend():
     go_friends()
 
 def do_remove_friend():
-    global pending_remove,current_screen
-    pending_remove=rem_box.text; current_screen="friends_confirm_remove"
+    global pending_remove,current_screen,message
+    if not friend_graph.are_friends(current_user,rem_box.text.strip()): message="Not in your friends list"; return
+    pending_remove=rem_box.text.strip(); current_screen="friends_confirm_remove"
+
+def toggle_selected(name):
+    if name in selected_requests: selected_requests.remove(name)
+    else: selected_requests.add(name)
+
+def picked(names):
+    # the ticked rows, or every row if none are ticked
+    return [n for n in names if n in selected_requests] or list(names)
+
+def do_accept_batch():
+    accept_requests(current_user, picked(request_cache.incoming)); selected_requests.clear()
+
+def do_decline_batch():
+    decline_requests(current_user, picked(request_cache.incoming)); selected_requests.clear()
+
+def do_cancel_batch():
+    cancel_requests(current_user, picked(request_cache.outgoing)); selected_requests.clear()
 
 def confirm_remove_friend():
     global pending_remove
@@ -348,18 +379,20 @@ def confirm_remove_friend():
 # UI Helpers
 def draw_title(text):
     pygame.draw.rect(screen,(46,204,113),(0,0,WIDTH,40))
-    lab=FONT.render(text,True,pygame.Color("white"))
+    lab=render_text(FONT,text,True,pygame.Color("white"))
     screen.blit(lab,(WIDTH//2-lab.get_width()//2,10))
+    scheduler.track("title",(0,0,WIDTH,40),text)
 
-def render_friend_list(page):
-    friends=get_friends(current_user); start=page*5; pagefriends=friends[start:start+5]
+def render_friend_list():
+    friend_pager.sync(current_user, friend_graph.version)
+    pagefriends=friend_pager.items; page=friend_pager.page; total_pages=friend_pager.total_pages
     y=60
     for f in pagefriends:
         r=pygame.Rect(40,y,WIDTH-80,50); pygame.draw.rect(screen,pygame.Color("white"),r); pygame.draw.rect(screen,pygame.Color("black"),r,2)
-        screen.blit(FONT.render(f,True,pygame.Color("black")),(r.x+10,r.y+15)); y+=60
-    total_pages=max((len(friends)+4)//5,1)
-    lab=FONT.render(f"Page {page+1}/{total_pages}",True,pygame.Color("black"))
+        screen.blit(render_text(FONT,f,True,pygame.Color("black")),(r.x+10,r.y+15)); y+=60
+    lab=render_text(FONT,f"Page {page+1}/{total_pages}",True,pygame.Color("black"))
     screen.blit(lab,(WIDTH//2-lab.get_width()//2,HEIGHT-90))
+    scheduler.track("friend_list",(0,50,WIDTH,HEIGHT-120),(tuple(pagefriends),page,total_pages))
     return total_pages
 
 # Input Boxes
@@ -378,9 +411,48 @@ speechbubble_img = pygame.transform.scale(speechbubble_img, (75, 75)).convert_al
 ai_response = "I'm Derek the Dandelion, I am here to help in all your gardening needs."
 user_input = ""
 input_active = False
-scroll_y = 0
+ai_box_rect = pygame.Rect(20, 470, 320, 100)
+ai_text_rect = ai_box_rect.inflate(-10, -10)
+ai_layout = TextLayout(FONT, ai_text_rect.width, line_height=20)
 viewing_archives = False
 plant_button_start_y = 110
+plant_list = VirtualList((30, 95, 200, 125), row_height=40, row_pitch=50)
+# fixed plants-screen regions; rows inside the list are resolved by plant_list.index_at
+plants_layout = Layout(lambda layout: layout.node(screen.get_rect(), None, (
+    layout.node(plant_list.rect, "plant_list"),
+    layout.node((20, 360, 320, 30), "ai_input"),
+    layout.node(ai_box_rect, "ai_box"),
+))).update()
+plant_list_key = None
+
+def refresh_plant_list():
+    # the repository keeps active/archived partitions; just point the list
+    # at the right one (re-clamping the scroll if it shrank)
+    global plant_list_key
+    key = (plant_repo.version, viewing_archives)
+    if key != plant_list_key:
+        plant_list_key = key
+        plant_list.set_items(plant_repo.view(viewing_archives))
+
+def toggle_archives():
+    global viewing_archives
+    viewing_archives = not viewing_archives
+    plant_list.scroll_y = 0
+
+def draw_plant_row(sc, plant, r):
+    pygame.draw.rect(sc, (180, 220, 180), r, border_radius=6)
+    pygame.draw.rect(sc, (0,0,0), r, 2, border_radius=6)
+    text_x = r.x + 10
+    if plant.get('photo'):
+        # thumbnail loads in the background; grey placeholder until then
+        slot = pygame.Rect(r.x + 4, r.y + 4, 32, 32)
+        thumb = thumbnails.get(plant['photo'])
+        if thumb is not None:
+            sc.blit(thumb, thumb.get_rect(center=slot.center))
+        else:
+            pygame.draw.rect(sc, (210, 210, 210), slot, border_radius=4)
+        text_x = slot.right + 6
+    sc.blit(render_text(FONT, plant.get('name', '') + (" (A)" if plant.get('archived') else ""), True, (0,0,0)), (text_x, r.y+10))
 
 # Reuse the Button class above for main UI buttons
 
@@ -405,40 +477,39 @@ def open_add_plant_window(prefill=None, index=None, plant_db_id=None):
         file_path = filedialog.askopenfilename(filetypes=[("Images", "*.png;*.jpg;*.jpeg")])
         if file_path:
             photo_path = file_path
+            thumbnails.forget(file_path)   # the file may have changed since it was last shown
 
     def save_or_add():
         nonlocal running
         plant_data = {"name": name, "age": age, "shade": shade, "notes": notes, "photo": photo_path, "archived": archived}
         # Save to DB
         if prefill and 'id' in prefill:
-            save_plant_to_db(plant_data, plant_id=prefill['id'])
+            plant_repo.update(prefill['id'], plant_data)
         else:
-            save_plant_to_db(plant_data, plant_id=None)
+            plant_repo.add(plant_data)
         # also save to json
-        refresh_plants_from_db()
         save_plants_to_json()
         running = False
 
     def delete_plant():
         nonlocal running
         if prefill and 'id' in prefill:
-            delete_plant_from_db(prefill['id'])
-            refresh_plants_from_db()
+            plant_repo.delete(prefill['id'])
             save_plants_to_json()
         running = False
 
     def archive_plant():
         nonlocal running
         if prefill and 'id' in prefill:
-            save_plant_to_db({"name":name,"age":age,"shade":shade,"notes":notes,"photo":photo_path,"archived":True}, plant_id=prefill['id'])
-            refresh_plants_from_db(); save_plants_to_json()
+            plant_repo.update(prefill['id'], {"name":name,"age":age,"shade":shade,"notes":notes,"photo":photo_path,"archived":True})
+            save_plants_to_json()
         running = False
 
     def unarchive_plant():
         nonlocal running
         if prefill and 'id' in prefill:
-            save_plant_to_db({"name":name,"age":age,"shade":shade,"notes":notes,"photo":photo_path,"archived":False}, plant_id=prefill['id'])
-            refresh_plants_from_db(); save_plants_to_json()
+            plant_repo.update(prefill['id'], {"name":name,"age":age,"shade":shade,"notes":notes,"photo":photo_path,"archived":False})
+            save_plants_to_json()
         running = False
 
     # Rects
@@ -454,8 +525,9 @@ def open_add_plant_window(prefill=None, index=None, plant_db_id=None):
         "unarchive": pygame.Rect(180, 560, 120, 40)
     }
 
+    scheduler.invalidate()
     while running:
-        for event in pygame.event.get():
+        for event in scheduler.events():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -486,57 +558,91 @@ def open_add_plant_window(prefill=None, index=None, plant_db_id=None):
 
         # Draw modal
         screen.fill((240,240,240))
-        screen.blit(FONT.render("Name:", True, (0,0,0)), (30,30))
-        screen.blit(FONT.render("Age:", True, (0,0,0)), (30,90))
-        screen.blit(FONT.render("Shade:", True, (0,0,0)), (30,150))
-        screen.blit(FONT.render("Notes:", True, (0,0,0)), (30,280))
+        screen.blit(render_text(FONT, "Name:", True, (0,0,0)), (30,30))
+        screen.blit(render_text(FONT, "Age:", True, (0,0,0)), (30,90))
+        screen.blit(render_text(FONT, "Shade:", True, (0,0,0)), (30,150))
+        screen.blit(render_text(FONT, "Notes:", True, (0,0,0)), (30,280))
 
         pygame.draw.rect(screen, (255,255,255), rects["name"])
-        screen.blit(FONT.render(name, True, (0,0,0)), (rects["name"].x + 5, rects["name"].y + 5))
+        screen.blit(render_text(FONT, name, True, (0,0,0)), (rects["name"].x + 5, rects["name"].y + 5))
         pygame.draw.rect(screen, (255,255,255), rects["age"])
-        screen.blit(FONT.render(age, True, (0,0,0)), (rects["age"].x + 5, rects["age"].y + 5))
+        screen.blit(render_text(FONT, age, True, (0,0,0)), (rects["age"].x + 5, rects["age"].y + 5))
         pygame.draw.rect(screen, (200,200,200) if not shade else (60,217,28), rects["shade"])
-        screen.blit(FONT.render("Shade" if shade else "Sun", True, (0,0,0)), (rects["shade"].x + 5, rects["shade"].y + 5))
+        screen.blit(render_text(FONT, "Shade" if shade else "Sun", True, (0,0,0)), (rects["shade"].x + 5, rects["shade"].y + 5))
         pygame.draw.rect(screen, (255,255,255), rects["notes"])
-        screen.blit(FONT.render(notes, True, (0,0,0)), (rects["notes"].x + 5, rects["notes"].y + 5))
+        screen.blit(render_text(FONT, notes, True, (0,0,0)), (rects["notes"].x + 5, rects["notes"].y + 5))
         pygame.draw.rect(screen, (180,180,255), rects["photo"])
-        screen.blit(FONT.render("Add Photo", True, (0,0,0)), (rects["photo"].x + 10, rects["photo"].y + 5))
+        screen.blit(render_text(FONT, "Add Photo", True, (0,0,0)), (rects["photo"].x + 10, rects["photo"].y + 5))
         if photo_path:
-            screen.blit(FONT.render(os.path.basename(photo_path), True, (0,0,0)), (rects["photo"].x + 130, rects["photo"].y + 5))
+            screen.blit(render_text(FONT, os.path.basename(photo_path), True, (0,0,0)), (rects["photo"].x + 130, rects["photo"].y + 5))
         pygame.draw.rect(screen, (100,255,100), rects["save"])
-        screen.blit(FONT.render("Save Changes" if prefill else "Add to List", True, (0,0,0)), (rects["save"].x + 5, rects["save"].y + 10))
+        screen.blit(render_text(FONT, "Save Changes" if prefill else "Add to List", True, (0,0,0)), (rects["save"].x + 5, rects["save"].y + 10))
         if prefill:
             pygame.draw.rect(screen, (255,100,100), rects["delete"])
-            screen.blit(FONT.render("Delete Plant", True, (0,0,0)), (rects["delete"].x + 5, rects["delete"].y + 10))
+            screen.blit(render_text(FONT, "Delete Plant", True, (0,0,0)), (rects["delete"].x + 5, rects["delete"].y + 10))
             pygame.draw.rect(screen, (255,200,100), rects["archive"])
-            screen.blit(FONT.render("Archive", True, (0,0,0)), (rects["archive"].x + 5, rects["archive"].y + 10))
+            screen.blit(render_text(FONT, "Archive", True, (0,0,0)), (rects["archive"].x + 5, rects["archive"].y + 10))
             pygame.draw.rect(screen, (200,255,100), rects["unarchive"])
-            screen.blit(FONT.render("Unarchive", True, (0,0,0)), (rects["unarchive"].x + 5, rects["unarchive"].y + 10))
+            screen.blit(render_text(FONT, "Unarchive", True, (0,0,0)), (rects["unarchive"].x + 5, rects["unarchive"].y + 10))
 
-        pygame.display.flip()
+        scheduler.track("plant_form", screen.get_rect(), (name, age, shade, notes, photo_path))
+        scheduler.present()
+    # back to the main loop: its frame needs a full redraw
+    scheduler.invalidate()
 
 # AI Action for gardening tips
 
 def gardening_tip_action():
-    global ai_response, user_input
+    global ai_response, ai_streamed, user_input
+    # whatever happens below replaces the question still streaming, if any
+    ai_streamed = ""
     if not user_input.strip():
+        ai_worker.cancel()
         ai_response = "Please type a question first."
         return
+    prompt = user_input
+    cached = answer_cache.get(prompt, MODEL_NAME)
+    if cached is not None:
+        ai_worker.cancel()
+        ai_response = cached
+        return
     ai_response = "Thinking..."
-    def fetch_response():
-        global ai_response
-        ai_response = query_ollama(user_input)
-    threading.Thread(target=fetch_response, daemon=True).start()
-
-# Initial sync
-load_plants_from_json()
-import_json_plants_to_db()
+    ai_worker.submit(prompt)
+
+def run_generation(prompt, emit, cancelled):
+    # runs on the AI worker thread; results reach the UI via ai_worker.poll()
+    answer = query_ollama(prompt, on_token=lambda token: emit("token", token), cancelled=cancelled)
+    if not cancelled(): emit("done", answer)
+
+ai_worker = AIWorker(run_generation, max_concurrent=1, wake=scheduler.wake, on_exit=db.release)
+ai_streamed = ""
+
+def apply_ai_results():
+    global ai_response, ai_streamed
+    for kind, payload in ai_worker.poll():
+        if kind == "token":
+            # show the answer growing as tokens arrive
+            ai_streamed += payload
+            ai_response = ai_streamed.lstrip()
+        else:
+            ai_response = payload
+
+# Initial sync: only import/export the side that changed since last run
+if plant_sync.file_changed():
+    import_json_plants_to_db()
 refresh_plants_from_db()
-save_plants_to_json()
+if plant_sync.needs_export():
+    save_plants_to_json()
 
 # Main Loop
 running = True
+last_screen = None
 while running:
+    if current_screen != last_screen:
+        scheduler.invalidate(); last_screen = current_screen
+    apply_ai_results()
+    thumbnails.poll()
+    auth_worker.poll()
     screen.fill((255, 255, 255))
     buttons = []
 
@@ -549,21 +655,21 @@ while running:
     elif current_screen == "plants": draw_title("Plants")
 
     # Screens
-    incoming_count = len(get_incoming_requests(current_user)) if current_user else 0
-    outgoing_count = len(get_outgoing_requests(current_user)) if current_user else 0
+    incoming_count = request_cache.incoming_count()
+    outgoing_count = request_cache.outgoing_count()
 
     if current_screen == "home":
         # Checklist Area
         pygame.draw.rect(screen, (255, 255, 255), checklist_area, border_radius=8)
         pygame.draw.rect(screen, (0, 0, 0), checklist_area, 2, border_radius=8)
-        screen.blit(FONT.render("Checklist", True, (0, 0, 0)), (checklist_area.x + 5, checklist_area.y - 25))
+        screen.blit(render_text(FONT, "Checklist", True, (0, 0, 0)), (checklist_area.x + 5, checklist_area.y - 25))
 
         # Render tasks
+        checklist_layout.update(len(checklist_items))
         for i, item in enumerate(checklist_items):
-            y = checklist_area.y + 10 + i * item_height
-            box_rect = pygame.Rect(checklist_area.x + 10, y, checkbox_size, checkbox_size)
-            text_rect = pygame.Rect(box_rect.right + 10, y, 200, checkbox_size)
-            delete_rect = pygame.Rect(checklist_area.right - 35, y, 25, 25)
+            box_rect = checklist_layout.rect(("toggle", i))
+            delete_rect = checklist_layout.rect(("delete", i))
+            y = box_rect.y
 
             if i == editing_index:
                 pygame.draw.rect(screen, (220, 240, 255), (box_rect.right + 8, y, 220, checkbox_size))
@@ -576,21 +682,21 @@ while running:
                 pygame.draw.line(screen, (0, 150, 0), (box_rect.x + 9, box_rect.y + 18),
                                  (box_rect.x + 18, box_rect.y + 4), 2)
 
-            text_surface = FONT.render(text_input if i == editing_index else item["text"], True, (0, 0, 0))
+            text_surface = render_text(FONT, text_input if i == editing_index else item["text"], True, (0, 0, 0))
             screen.blit(text_surface, (box_rect.right + 12, y))
 
             pygame.draw.rect(screen, (255, 100, 100), delete_rect, border_radius=6)
             pygame.draw.rect(screen, (0, 0, 0), delete_rect, 2, border_radius=6)
-            screen.blit(SMLFONT.render("X", True, (0, 0, 0)), (delete_rect.x + 7, delete_rect.y + 4))
+            screen.blit(render_text(SMLFONT, "X", True, (0, 0, 0)), (delete_rect.x + 7, delete_rect.y + 4))
 
         # Add new task button
-        add_button_rect = pygame.Rect(checklist_area.x + 10,
-                                      checklist_area.y + 10 + len(checklist_items) * item_height,
-                                      120, 30)
+        add_button_rect = checklist_layout.rect(("add",))
         pygame.draw.rect(screen, (100, 220, 100), add_button_rect, border_radius=6)
         pygame.draw.rect(screen, (0, 0, 0), add_button_rect, 2, border_radius=6)
-        screen.blit(FONT.render("+ Add Task", True, (0, 0, 0)),
+        screen.blit(render_text(FONT, "+ Add Task", True, (0, 0, 0)),
                     (add_button_rect.x + 10, add_button_rect.y + 5))
+        scheduler.track("checklist", checklist_area.union(add_button_rect).inflate(4, 60),
+                        (tuple((item["text"], item["checked"]) for item in checklist_items), editing_index, text_input))
 
         # Home page account/login button
         if current_user:
@@ -612,17 +718,10 @@ while running:
 
     elif current_screen == "plants":
         # Left column: plant list
-        screen.blit(FONT.render("Your Plants", True, (0,0,0)), (30,60))
-        y_off = 90
-        for i, plant in enumerate(plants):
-            if viewing_archives and not plant.get('archived'):
-                continue
-            if not viewing_archives and plant.get('archived'):
-                continue
-            r = pygame.Rect(30, y_off + i*50, 200, 40)
-            pygame.draw.rect(screen, (180, 220, 180), r, border_radius=6)
-            pygame.draw.rect(screen, (0,0,0), r, 2, border_radius=6)
-            screen.blit(FONT.render(plant.get('name', '') + (" (A)" if plant.get('archived') else ""), True, (0,0,0)), (r.x+10, r.y+10))
+        screen.blit(render_text(FONT, "Your Plants", True, (0,0,0)), (30,60))
+        refresh_plant_list()
+        plant_list.draw(screen, draw_plant_row)
+        scheduler.track("plant_list", plant_list.rect.inflate(20, 4), (plant_repo.version, viewing_archives, plant_list.scroll_y, thumbnails.version))
 
         # Draw images
         screen.blit(plant_img, (220, 250))
@@ -632,107 +731,126 @@ while running:
         buttons = [
             Button("Add Plant", 120, 10, 120, 40, lambda: open_add_plant_window()),
             Button("Ask Derek the Dandelion", 30, 400, 300, 50, gardening_tip_action),
-            Button("Toggle Archives", 120, 60, 120, 30, lambda: globals().update(viewing_archives=not viewing_archives)),
+            Button("Toggle Archives", 120, 60, 120, 30, toggle_archives),
             Button("Back", 120, HEIGHT-50, 120, 40, go_home)
         ]
 
         # AI input box
-        input_box = pygame.Rect(20, 360, 320, 30)
+        input_box = plants_layout.rect("ai_input")
         pygame.draw.rect(screen, (255, 255, 255), input_box, border_radius=6)
         pygame.draw.rect(screen, (0, 0, 0), input_box, 2, border_radius=6)
-        screen.blit(FONT.render(user_input, True, (0, 0, 0)), (input_box.x + 5, input_box.y + 5))
+        screen.blit(render_text(FONT, user_input, True, (0, 0, 0)), (input_box.x + 5, input_box.y + 5))
+        scheduler.track("ai_input", input_box, user_input)
 
         # AI response box
         if ai_response:
-            box_rect = pygame.Rect(20, 470, 320, 100)
-            pygame.draw.rect(screen, (230, 230, 230), box_rect, border_radius=8)
-            pygame.draw.rect(screen, (0, 0, 0), box_rect, 2, border_radius=8)
-            clip_rect = box_rect.inflate(-10, -10)
-            screen.set_clip(clip_rect)
-            words, line, lines = ai_response.split(), "", []
-            for word in words:
-                test_line = line + word + " "
-                if FONT.render(test_line, True, (0, 0, 0)).get_width() > clip_rect.width:
-                    lines.append(line)
-                    line = word + " "
-                else:
-                    line = test_line
-            if line: lines.append(line)
-            y = clip_rect.y + scroll_y
-            for line in lines:
-                screen.blit(FONT.render(line, True, (0, 0, 0)), (clip_rect.x, y))
-                y += 20
-            screen.set_clip(None)
+            pygame.draw.rect(screen, (230, 230, 230), ai_box_rect, border_radius=8)
+            pygame.draw.rect(screen, (0, 0, 0), ai_box_rect, 2, border_radius=8)
+            ai_layout.set_text(ai_response)
+            ai_layout.draw(screen, ai_text_rect)
+            scheduler.track("ai_response", ai_box_rect, (ai_response, ai_layout.scroll_y))
 
     elif current_screen == "login":
-        label_surface = FONT.render("Username:", True, (0,0,0)); screen.blit(label_surface, (login_user.rect.x, login_user.rect.y - 25))
-        label_surface = FONT.render("Password:", True, (0,0,0)); screen.blit(label_surface, (login_pass.rect.x, login_pass.rect.y - 25))
+        label_surface = render_text(FONT, "Username:", True, (0,0,0)); screen.blit(label_surface, (login_user.rect.x, login_user.rect.y - 25))
+        label_surface = render_text(FONT, "Password:", True, (0,0,0)); screen.blit(label_surface, (login_pass.rect.x, login_pass.rect.y - 25))
         login_user.draw(screen); login_pass.draw(screen)
         buttons = [Button("Log in", 65, 340, 230, 50, do_login),
                    Button("Register", 65, 410, 230, 50, go_register),
                    Button("Back", 65, 480, 230, 50, go_home)]
     elif current_screen == "register":
-        label_surface = FONT.render("Username:", True, (0,0,0)); screen.blit(label_surface, (reg_user.rect.x, reg_user.rect.y - 25))
-        label_surface = FONT.render("Password:", True, (0,0,0)); screen.blit(label_surface, (reg_pass.rect.x, reg_pass.rect.y - 25))
-        label_surface = FONT.render("Confirm Password:", True, (0,0,0)); screen.blit(label_surface, (reg_conf.rect.x, reg_conf.rect.y - 25))
+        label_surface = render_text(FONT, "Username:", True, (0,0,0)); screen.blit(label_surface, (reg_user.rect.x, reg_user.rect.y - 25))
+        label_surface = render_text(FONT, "Password:", True, (0,0,0)); screen.blit(label_surface, (reg_pass.rect.x, reg_pass.rect.y - 25))
+        label_surface = render_text(FONT, "Confirm Password:", True, (0,0,0)); screen.blit(label_surface, (reg_conf.rect.x, reg_conf.rect.y - 25))
         reg_user.draw(screen); reg_pass.draw(screen); reg_conf.draw(screen)
         buttons = [Button("Register", 65, 370, 230, 50, do_register),
                    Button("Back", 65, 440, 230, 50, go_login)]
     elif current_screen == "account":
-        screen.blit(FONT.render(f"Logged in as {current_user}", True, (0, 0, 0)), (50, 150))
+        screen.blit(render_text(FONT, f"Logged in as {current_user}", True, (0, 0, 0)), (50, 150))
         buttons = [Button("Logout", 65, 250, 230, 50, do_logout),
                    Button("Back", 65, 320, 230, 50, go_home)]
     elif current_screen == "friends":
-        total_pages = render_friend_list(friend_page)
-        buttons = [Button("Add Friend", 65, 370, 230, 40, go_add_friend),
+        total_pages = render_friend_list()
+        buttons = [Button("Add Friend", 65, 370, 110, 40, go_add_friend),
+                   Button("Suggestions", 185, 370, 110, 40, go_suggestions),
                    Button("Remove Friend", 65, 420, 230, 40, go_remove_friend),
                    Button(f"Incoming ({incoming_count})", 65, 470, 230, 40, go_incoming),
                    Button(f"Outgoing ({outgoing_count})", 65, 520, 230, 40, go_outgoing),
                    Button("Plants", 30, HEIGHT-50, 120, 40, go_plants),
                    Button("Home", WIDTH//2 - 60, HEIGHT-50, 120, 40, go_home),  
                    Button("Friends", WIDTH-150, HEIGHT-50, 120, 40, lambda: go_friends() if current_user else None)]
-        if friend_page > 0:
-            buttons.append(Button("<", 30, HEIGHT-90, 40, 30, lambda: globals().update(friend_page=friend_page-1)))
-        if friend_page < total_pages-1:
-            buttons.append(Button(">", WIDTH-70, HEIGHT-90, 40, 30, lambda: globals().update(friend_page=friend_page+1)))
+        if friend_pager.has_prev():
+            buttons.append(Button("<", 30, HEIGHT-90, 40, 30, friend_pager.prev))
+        if friend_pager.has_next():
+            buttons.append(Button(">", WIDTH-70, HEIGHT-90, 40, 30, friend_pager.next))
     elif current_screen == "friends_add":
-        label_surface = FONT.render("Friend Username:", True, (0,0,0)); screen.blit(label_surface, (add_box.rect.x, add_box.rect.y - 25))
+        label_surface = render_text(FONT, "Friend Username(s), comma-separated:", True, (0,0,0)); screen.blit(label_surface, (add_box.rect.x, add_box.rect.y - 25))
         add_box.draw(screen)
         buttons = [Button("Add", 65, 240, 230, 40, do_add_friend),
                    Button("Back", 65, 300, 230, 40, go_friends)]
     elif current_screen == "friends_remove":
-        label_surface = FONT.render("Friend Username:", True, (0,0,0)); screen.blit(label_surface, (rem_box.rect.x, rem_box.rect.y - 25))
+        label_surface = render_text(FONT, "Friend Username:", True, (0,0,0)); screen.blit(label_surface, (rem_box.rect.x, rem_box.rect.y - 25))
         rem_box.draw(screen)
         buttons = [Button("Remove", 65, 240, 230, 40, do_remove_friend),
                    Button("Back", 65, 300, 230, 40, go_friends)]
     elif current_screen == "friends_confirm_remove":
-        screen.blit(FONT.render(f"Remove {pending_remove}?", True, (0, 0, 0)), (60, 200))
+        screen.blit(render_text(FONT, f"Remove {pending_remove}?", True, (0, 0, 0)), (60, 200))
         buttons = [Button("Yes", 65, 260, 100, 40, confirm_remove_friend),
                    Button("No", 200, 260, 100, 40, go_friends)]
     elif current_screen == "friends_incoming":
         y = 60
-        for s in get_incoming_requests(current_user):
+        for s in list(request_cache.incoming):
             r = pygame.Rect(40, y, WIDTH-80, 50)
             pygame.draw.rect(screen, (255, 255, 255), r)
             pygame.draw.rect(screen, (0, 0, 0), r, 2)
-            screen.blit(FONT.render(s, True, (0, 0, 0)), (r.x + 10, r.y + 15))
-            buttons += [Button("/", r.right-60, r.y+10, 20, 20, lambda sender=s: accept_request(sender, current_user)),
+            screen.blit(render_text(FONT, s, True, (0, 0, 0)), (r.x + 40, r.y + 15))
+            buttons += [Button("x" if s in selected_requests else "", r.x+10, r.y+15, 20, 20,
+                               lambda sender=s: toggle_selected(sender), (90, 90, 90)),
+                        Button("/", r.right-60, r.y+10, 20, 20, lambda sender=s: accept_request(sender, current_user)),
                         Button("X", r.right-30, r.y+10, 20, 20, lambda sender=s: decline_request(sender, current_user))]
             y += 60
+        if request_cache.incoming:
+            n = len(selected_requests.intersection(request_cache.incoming))
+            buttons += [Button(f"Accept ({n})" if n else "Accept All", 65, HEIGHT-110, 110, 40, do_accept_batch),
+                        Button(f"Decline ({n})" if n else "Decline All", 185, HEIGHT-110, 110, 40, do_decline_batch)]
         buttons.append(Button("Back", 65, HEIGHT-60, 230, 40, go_friends))
+        scheduler.track("request_list", (0, 50, WIDTH, HEIGHT-120), tuple(request_cache.incoming))
+    elif current_screen == "friends_suggest":
+        screen.blit(render_text(FONT, "People you may know", True, (0, 0, 0)), (40, 50))
+        # skip anyone we already have a pending request with
+        pending = tuple(request_cache.outgoing) + tuple(request_cache.incoming)
+        top = get_suggestions(current_user).top(5, exclude=pending)
+        y = 80
+        for name, mutual in top:
+            r = pygame.Rect(40, y, WIDTH-80, 50)
+            pygame.draw.rect(screen, (255, 255, 255), r)
+            pygame.draw.rect(screen, (0, 0, 0), r, 2)
+            screen.blit(render_text(FONT, name, True, (0, 0, 0)), (r.x + 10, r.y + 8))
+            screen.blit(render_text(SMLFONT, f"{mutual} mutual friend{'s' if mutual != 1 else ''}", True, (90, 90, 90)), (r.x + 10, r.y + 28))
+            buttons.append(Button("+", r.right-30, r.y+15, 20, 20, lambda rec=name: send_request(current_user, rec)))
+            y += 60
+        if not top:
+            screen.blit(render_text(FONT, "No suggestions yet", True, (90, 90, 90)), (40, 80))
+        buttons.append(Button("Back", 65, HEIGHT-60, 230, 40, go_friends))
+        scheduler.track("request_list", (0, 45, WIDTH, HEIGHT-120), tuple(top))
     elif current_screen == "friends_outgoing":
         y = 60
-        for rcv in get_outgoing_requests(current_user):
+        for rcv in list(request_cache.outgoing):
             r = pygame.Rect(40, y, WIDTH-80, 50)
             pygame.draw.rect(screen, (255, 255, 255), r)
             pygame.draw.rect(screen, (0, 0, 0), r, 2)
-            screen.blit(FONT.render(rcv, True, (0, 0, 0)), (r.x + 10, r.y + 15))
-            buttons.append(Button("X", r.right-30, r.y+10, 20, 20, lambda rec=rcv: cancel_request(current_user, rec)))
+            screen.blit(render_text(FONT, rcv, True, (0, 0, 0)), (r.x + 40, r.y + 15))
+            buttons += [Button("x" if rcv in selected_requests else "", r.x+10, r.y+15, 20, 20,
+                               lambda rec=rcv: toggle_selected(rec), (90, 90, 90)),
+                        Button("X", r.right-30, r.y+10, 20, 20, lambda rec=rcv: cancel_request(current_user, rec))]
             y += 60
+        if request_cache.outgoing:
+            n = len(selected_requests.intersection(request_cache.outgoing))
+            buttons.append(Button(f"Cancel ({n})" if n else "Cancel All", 65, HEIGHT-110, 230, 40, do_cancel_batch))
         buttons.append(Button("Back", 65, HEIGHT-60, 230, 40, go_friends))
+        scheduler.track("request_list", (0, 50, WIDTH, HEIGHT-120), tuple(request_cache.outgoing))
 
     # Events
-    for e in pygame.event.get():
+    for e in scheduler.events():
         if e.type == pygame.QUIT: 
             running = False
 
@@ -746,24 +864,21 @@ while running:
         # Checklist events
         if current_screen == "home":
             if e.type == pygame.MOUSEBUTTONDOWN:
-                if add_button_rect.collidepoint(e.pos):
+                # same layout the draw pass used (tasks may have changed since)
+                hit = checklist_layout.update(len(checklist_items)).hit(e.pos)
+                if hit == ("add",):
                     checklist_items.append({"text": "New Task", "checked": False})
-                for i, item in enumerate(checklist_items):
-                    y = checklist_area.y + 10 + i * item_height
-                    box_rect = pygame.Rect(checklist_area.x + 10, y, checkbox_size, checkbox_size)
-                    text_rect = pygame.Rect(box_rect.right + 10, y, 200, checkbox_size)
-                    delete_rect = pygame.Rect(checklist_area.right - 35, y, 25, 25)
-
-                    if box_rect.collidepoint(e.pos):
-                        item["checked"] = not item["checked"]
-                    elif text_rect.collidepoint(e.pos):
+                elif hit is not None:
+                    action, i = hit
+                    if action == "toggle":
+                        checklist_items[i]["checked"] = not checklist_items[i]["checked"]
+                    elif action == "edit":
                         editing_index = i
-                        text_input = item["text"]
-                    elif delete_rect.collidepoint(e.pos):
+                        text_input = checklist_items[i]["text"]
+                    elif action == "delete":
                         checklist_items.pop(i)
                         if editing_index == i:
                             editing_index = None
-                        break
 
             elif e.type == pygame.KEYDOWN and editing_index is not None:
                 if e.key == pygame.K_RETURN:
@@ -776,30 +891,17 @@ while running:
 
         # Plants screen events: click plant to edit, input box for AI
         if current_screen == "plants":
+            # plant list: wheel/drag scrolling, click (release without drag) to edit
+            clicked_plant = plant_list.handle_event(e)
+            if clicked_plant is not None:
+                open_add_plant_window(prefill=dict(clicked_plant))
             if e.type == pygame.MOUSEBUTTONDOWN:
-                mx,my = e.pos
-                # detect clicks on plant entries
-                y_base = 90
-                clicked_index = None
-                visible_index = 0
-                for i, plant in enumerate(plants):
-                    if viewing_archives and not plant.get('archived'):
-                        continue
-                    if not viewing_archives and plant.get('archived'):
-                        continue
-                    r = pygame.Rect(30, y_base + visible_index*50, 200, 40)
-                    if r.collidepoint(mx,my):
-                        clicked_index = i
-                        break
-                    visible_index += 1
-                if clicked_index is not None:
-                    open_add_plant_window(prefill=plants[clicked_index])
                 # input box activation
-                input_box_rect = pygame.Rect(20, 360, 320, 30)
-                if input_box_rect.collidepoint(mx,my):
-                    input_active = True
-                else:
-                    input_active = False
+                input_active = plants_layout.hit(e.pos) == "ai_input"
+            elif e.type == pygame.MOUSEWHEEL:
+                # scroll long answers in the response box
+                if plants_layout.hit(pygame.mouse.get_pos()) == "ai_box":
+                    ai_layout.scroll(e.y * ai_layout.line_height, ai_text_rect.height)
             elif e.type == pygame.KEYDOWN:
                 if e.key == pygame.K_RETURN:
                     gardening_tip_action()
@@ -812,14 +914,20 @@ while running:
     for b in buttons: b.draw(screen)
 
     # Messages
-    if message: screen.blit(FONT.render(message, True, (200, 0, 0)), (125, 580))
+    if message: screen.blit(render_text(FONT, message, True, (200, 0, 0)), (125, 580))
     if login_warning:
-        screen.blit(FONT.render(login_warning, True, (200, 0, 0)), (125, 560))
+        screen.blit(render_text(FONT, login_warning, True, (200, 0, 0)), (125, 560))
         if pygame.time.get_ticks() - warning_timer > 3000: login_warning = None
+    scheduler.track("message", (0, 555, WIDTH, 45), (message, login_warning))
 
-    pygame.display.flip()
+    scheduler.present()
 
-# On exit, persist plants snapshot to JSON
-save_plants_to_json()
+# On exit, write out any pending plants snapshot
+snapshot_writer.close()
+ai_worker.stop()
+thumbnails.stop()
+auth_worker.stop()
+ollama.close()
+db.close()
 pygame.quit()
 sys.exit()
@@ -1,8 +1,9 @@
 import sqlite3
-import hashlib
 import pygame
 import sys
 
+from passwords import hash_password, check_password, AuthWorker
+
 # ------------------ Database ------------------ #
 DB_FILE = "appdata.db"
 
@@ -25,13 +26,19 @@ def setup_database():
     conn.commit()
     conn.close()
 
-def hash_pw(p): return hashlib.sha256(p.encode()).hexdigest()
+def hash_pw(p): return hash_password(p)
 
 def validate_login(u, p):
     c=sqlite3.connect(DB_FILE); cur=c.cursor()
     cur.execute("SELECT password FROM userdata WHERE username=?",(u,))
-    r=cur.fetchone(); c.close()
-    return r and r[0]==hash_pw(p)
+    r=cur.fetchone()
+    if not r: c.close(); return False
+    ok, upgraded = check_password(p, r[0])
+    if upgraded:
+        # old unsalted/weaker hash: store the current format now that we know the password
+        cur.execute("UPDATE userdata SET password=? WHERE username=? AND password=?",(upgraded,u,r[0])); c.commit()
+    c.close()
+    return ok
 
 def try_register(u, p):
     try:
@@ -187,15 +194,23 @@ def go_outgoing():
     global current_screen; current_screen="friends_outgoing"
 
 # ------------------ Actions ------------------ #
-def do_login():
+# login/register hash on auth_worker; finish_auth runs back on the UI thread
+auth_worker = AuthWorker()
+def finish_auth(u, ok, error):
     global current_user,message
-    if validate_login(login_user.text,login_pass.text): current_user=login_user.text; go_home()
-    else: message="Invalid login"
+    if ok: current_user=u; go_home()
+    else: message=error
+def do_login():
+    global message
+    if auth_worker.busy(): return
+    u=login_user.text; message="Logging in..."
+    auth_worker.submit(validate_login, u, login_pass.text, on_done=lambda ok: finish_auth(u, ok, "Invalid login"))
 def do_register():
-    global current_user,message
+    global message
     if reg_pass.text!=reg_conf.text: message="Passwords do not match"; return
-    if try_register(reg_user.text,reg_pass.text): current_user=reg_user.text; go_home()
-    else: message="Username exists"
+    if auth_worker.busy(): return
+    u=reg_user.text; message="Registering..."
+    auth_worker.submit(try_register, u, reg_pass.text, on_done=lambda ok: finish_auth(u, ok, "Username exists"))
 def do_logout(): 
     global current_user; current_user=None; go_home()
 def do_add_friend():
@@ -252,6 +267,7 @@ add_box=InputBox(45,180,240,40); rem_box=InputBox(45,180,240,40)
 # ------------------ Main Loop ------------------ #
 running = True
 while running:
+    auth_worker.poll()
     screen.fill((255, 255, 255))
     buttons = []
 
@@ -447,5 +463,6 @@ while running:
 
     pygame.display.flip()
 
+auth_worker.stop()
 pygame.quit()
 sys.exit()
\ No newline at end of file
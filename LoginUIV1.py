@@ -1,8 +1,9 @@
 import sqlite3
-import hashlib
 import pygame
 import sys
 
+from passwords import hash_password, check_password, AuthWorker
+
 # ------------------ Database Setup ------------------ #
 DB_FILE = "appdata.db"
 
@@ -20,16 +21,22 @@ def setup_database():
     conn.close()
 
 # ------------------ Utility ------------------ #
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
-
 def validate_login(username, password):
     conn = sqlite3.connect(DB_FILE)
     cur = conn.cursor()
     cur.execute("SELECT password FROM userdata WHERE username = ?", (username,))
     result = cur.fetchone()
+    if not result:
+        conn.close()
+        return False
+    ok, upgraded = check_password(password, result[0])
+    if upgraded:
+        # legacy SHA-256 (or weaker) hash: re-hash now that we know the password
+        cur.execute("UPDATE userdata SET password = ? WHERE username = ? AND password = ?",
+                    (upgraded, username, result[0]))
+        conn.commit()
     conn.close()
-    return result and result[0] == hash_password(password)
+    return ok
 
 def try_register(username, password):
     try:
@@ -124,24 +131,37 @@ def go_account():
     global current_screen
     current_screen = "account"
 
-def do_login():
+# Hashing is slow on purpose: run it on the worker, finish on the UI thread
+auth_worker = AuthWorker()
+
+def finish_auth(username, ok, error):
     global current_user, message
-    if validate_login(login_user.text, login_pass.text):
-        current_user = login_user.text
+    if ok:
+        current_user = username
         go_home()
     else:
-        message = "Invalid login"
+        message = error
+
+def do_login():
+    global message
+    if auth_worker.busy():
+        return
+    username = login_user.text
+    message = "Logging in..."
+    auth_worker.submit(validate_login, username, login_pass.text,
+                       on_done=lambda ok: finish_auth(username, ok, "Invalid login"))
 
 def do_register():
-    global current_user, message
+    global message
     if reg_pass.text != reg_conf.text:
         message = "Passwords do not match"
         return
-    if try_register(reg_user.text, reg_pass.text):
-        current_user = reg_user.text
-        go_home()
-    else:
-        message = "Username already exists"
+    if auth_worker.busy():
+        return
+    username = reg_user.text
+    message = "Registering..."
+    auth_worker.submit(try_register, username, reg_pass.text,
+                       on_done=lambda ok: finish_auth(username, ok, "Username already exists"))
 
 def do_logout():
     global current_user
@@ -159,6 +179,7 @@ reg_conf = InputBox(45, 300, 240, 40, password=True)
 setup_database()
 running = True
 while running:
+    auth_worker.poll()
     screen.fill(pygame.Color("white"))
 
     # Build buttons first
@@ -236,5 +257,6 @@ while running:
 
     pygame.display.flip()
 
+auth_worker.stop()
 pygame.quit()
 sys.exit()
@@ -0,0 +1,143 @@
+import queue
+import threading
+
+# ------------------ AI Worker ------------------ #
+# Runs Derek's generations off the UI thread. Only the newest question
+# matters: submitting a new one (or cancel()) supersedes the request in
+# flight. Its cancelled() turns True, and whatever it registered with
+# cancelled.on_cancel() runs right away on the caller's thread, e.g. to
+# close its HTTP stream, so it gives up its thread even while it is still
+# waiting for a model load or its first token. A fixed number of worker
+# threads caps how many generations run at once (by default one).
+# Results go back through a queue that the UI drains once per frame with
+# poll(), so the UI thread is the only one touching its state.
+#
+#   run(prompt, emit, cancelled)
+#       emit(kind, payload)  -> ("token", str) / ("done", str) / ("error", str)
+#       cancelled()          -> True once a newer request was submitted
+#       cancelled.on_cancel(fn)  fn() runs when the request is superseded
+#   on_exit()  (optional) runs on each worker thread as it stops, e.g. to
+#              release the thread's database connection
+
+MAX_CONCURRENT = 1
+
+
+class Cancellation:
+    def __init__(self):
+        self._cancelled = False
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        return self._cancelled
+
+    def on_cancel(self, fn):
+        with self._lock:
+            if not self._cancelled:
+                self._callbacks.append(fn)
+                return
+        fn()
+
+    def cancel(self):
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            fn()
+
+
+class AIWorker:
+    def __init__(self, run, max_concurrent=MAX_CONCURRENT, wake=None, on_exit=None):
+        self.run = run
+        self.wake = wake
+        self.on_exit = on_exit
+        self.results = queue.Queue()
+        self._cond = threading.Condition()
+        self._pending = None    # (request id, prompt) waiting for a thread
+        self._running = {}      # request id -> Cancellation
+        self._latest = 0
+        self._stopped = False
+        self._threads = [threading.Thread(target=self._loop, daemon=True)
+                         for _ in range(max_concurrent)]
+        for t in self._threads:
+            t.start()
+
+    def _supersede(self):
+        # call with self._cond held; -> the running requests to cancel
+        self._latest += 1
+        running = list(self._running.values())
+        self._running.clear()
+        return running
+
+    def submit(self, prompt):
+        with self._cond:
+            stale = self._supersede()
+            self._pending = (self._latest, prompt)
+            self._cond.notify()
+            request_id = self._latest
+        for cancellation in stale:
+            cancellation.cancel()
+        return request_id
+
+    def cancel(self):
+        # drop the current request without starting a new one
+        with self._cond:
+            stale = self._supersede()
+            self._pending = None
+        for cancellation in stale:
+            cancellation.cancel()
+
+    def busy(self):
+        return self._pending is not None or bool(self._running)
+
+    def _loop(self):
+        try:
+            while True:
+                with self._cond:
+                    while self._pending is None and not self._stopped:
+                        self._cond.wait()
+                    if self._stopped:
+                        return
+                    request_id, prompt = self._pending
+                    self._pending = None
+                    cancelled = self._running[request_id] = Cancellation()
+                try:
+                    self.run(prompt,
+                             lambda kind, payload: self._emit(request_id, kind, payload),
+                             cancelled)
+                except Exception as e:
+                    self._emit(request_id, "error", f"AI error: {e}")
+                finally:
+                    with self._cond:
+                        self._running.pop(request_id, None)
+        finally:
+            if self.on_exit:
+                self.on_exit()
+
+    def _emit(self, request_id, kind, payload):
+        if request_id != self._latest:
+            return
+        self.results.put((request_id, kind, payload))
+        if self.wake:
+            self.wake()
+
+    def poll(self):
+        # messages for the newest request only; anything older is stale
+        out = []
+        while True:
+            try:
+                request_id, kind, payload = self.results.get_nowait()
+            except queue.Empty:
+                return out
+            if request_id == self._latest:
+                out.append((kind, payload))
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            stale = self._supersede()
+            self._cond.notify_all()
+        for cancellation in stale:
+            cancellation.cancel()
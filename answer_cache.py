@@ -0,0 +1,80 @@
+import re
+import time
+import hashlib
+
+# ------------------ AI Answer Cache ------------------ #
+# Derek's answers are stored in appdata.db so repeated questions
+# ("how often to water basil?") are answered without another LLM
+# generation. Entries are keyed by normalised prompt + model name,
+# expire after a TTL, and the least recently used ones are evicted once
+# the table grows past max_entries.
+
+DEFAULT_TTL = 7 * 24 * 3600     # one week
+DEFAULT_MAX_ENTRIES = 500
+
+
+def normalize_prompt(prompt):
+    # case, runs of whitespace and trailing punctuation don't change the question
+    text = re.sub(r"\s+", " ", prompt.strip().lower())
+    return text.rstrip(" ?!.")
+
+
+def cache_key(prompt, model):
+    return hashlib.sha256(f"{model}\0{normalize_prompt(prompt)}".encode()).hexdigest()
+
+
+class AnswerCache:
+    def __init__(self, store, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.store = store
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.setup()
+
+    def setup(self):
+        with self.store.transaction() as cur:
+            cur.execute("""CREATE TABLE IF NOT EXISTS ai_answers(
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )""")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_ai_answers_last_used ON ai_answers(last_used)")
+
+    def get(self, prompt, model):
+        key = cache_key(prompt, model)
+        row = self.store.fetchone("SELECT response, created FROM ai_answers WHERE key=?", (key,))
+        now = time.time()
+        if row is None or now - row[1] > self.ttl:
+            if row is not None:
+                self.store.execute("DELETE FROM ai_answers WHERE key=?", (key,))
+            self.misses += 1
+            return None
+        self.store.execute("UPDATE ai_answers SET last_used=? WHERE key=?", (now, key))
+        self.hits += 1
+        return row[0]
+
+    def put(self, prompt, model, response):
+        now = time.time()
+        with self.store.transaction() as cur:
+            cur.execute("INSERT OR REPLACE INTO ai_answers(key,model,prompt,response,created,last_used) VALUES(?,?,?,?,?,?)",
+                        (cache_key(prompt, model), model, normalize_prompt(prompt), response, now, now))
+            count = cur.execute("SELECT COUNT(*) FROM ai_answers").fetchone()[0]
+            if count > self.max_entries:
+                cur.execute("""DELETE FROM ai_answers WHERE key IN (
+                    SELECT key FROM ai_answers ORDER BY last_used LIMIT ?)""", (count - self.max_entries,))
+                self.evictions += count - self.max_entries
+
+    def purge_expired(self):
+        self.store.execute("DELETE FROM ai_answers WHERE created < ?", (time.time() - self.ttl,))
+
+    def stats(self):
+        total = self.hits + self.misses
+        entries = self.store.fetchone("SELECT COUNT(*) FROM ai_answers")[0]
+        return {"entries": entries, "max_entries": self.max_entries, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0}
@@ -0,0 +1,807 @@
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+import tempfile
+import tracemalloc
+import threading
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from datastore import DataStore
+
+# ------------------ Benchmarks ------------------ #
+# Run with:  python benchmarks.py [name ...]   (no names = run everything)
+# Each benchmark works on throwaway files in a temp directory, never on
+# the real appdata.db.
+
+def timed(fn, n):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - start) / n
+
+
+def report(label, seconds):
+    print(f"  {label:<40} {seconds * 1e6:10.1f} us/call")
+
+
+def make_user_db(path, users=1000):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE userdata(id INTEGER PRIMARY KEY, username TEXT UNIQUE NOT NULL, password TEXT NOT NULL)")
+    conn.executemany("INSERT INTO userdata(username,password) VALUES(?,?)",
+                     ((f"user{i}", hashlib.sha256(b"pw").hexdigest()) for i in range(users)))
+    conn.commit()
+    conn.close()
+
+
+# --- connect per call vs shared data store --- #
+def bench_datastore(tmp, n=2000):
+    path = os.path.join(tmp, "bench.db")
+    make_user_db(path)
+
+    def per_call_connect(i):
+        c = sqlite3.connect(path); cur = c.cursor()
+        cur.execute("SELECT password FROM userdata WHERE username=?", (f"user{i % 1000}",))
+        cur.fetchone(); c.close()
+
+    store = DataStore(path)
+    def shared_store(i):
+        store.fetchone("SELECT password FROM userdata WHERE username=?", (f"user{i % 1000}",))
+
+    def per_call_write(i):
+        c = sqlite3.connect(path); cur = c.cursor()
+        cur.execute("UPDATE userdata SET password=? WHERE username=?", (str(i), f"user{i % 1000}"))
+        c.commit(); c.close()
+
+    def shared_write(i):
+        store.execute("UPDATE userdata SET password=? WHERE username=?", (str(i), f"user{i % 1000}"))
+
+    print("datastore: lookup / update latency")
+    report("read, connect per call", timed(per_call_connect, n))
+    report("read, shared store", timed(shared_store, n))
+    report("write, connect+commit per call", timed(per_call_write, n // 4))
+    report("write, shared store (WAL)", timed(shared_write, n // 4))
+    store.close()
+
+
+# --- idle CPU: unpaced flip loop vs render scheduler --- #
+def bench_idle_cpu(tmp, seconds=2.0):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from render_scheduler import RenderScheduler
+    pygame.init()
+    screen = pygame.display.set_mode((360, 650))
+
+    def cpu_share(frame):
+        wall, cpu = time.perf_counter(), time.process_time()
+        while time.perf_counter() - wall < seconds:
+            frame()
+        return (time.process_time() - cpu) / (time.perf_counter() - wall)
+
+    def unpaced():
+        pygame.event.get()
+        screen.fill((255, 255, 255))
+        pygame.display.flip()
+
+    scheduler = RenderScheduler()
+    def scheduled():
+        scheduler.events()
+        screen.fill((255, 255, 255))
+        scheduler.track("title", (0, 0, 360, 40), "Home")
+        scheduler.present()
+
+    print("idle CPU share of one core (360x650, no input)")
+    print(f"  {'unpaced flip loop':<40} {cpu_share(unpaced) * 100:10.1f} %")
+    print(f"  {'render scheduler':<40} {cpu_share(scheduled) * 100:10.1f} %")
+    pygame.quit()
+
+
+# --- text rendering: font.render every frame vs LRU surface cache --- #
+def bench_text_cache(tmp, frames=300):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from text_cache import TextCache
+    pygame.init()
+    font = pygame.font.SysFont(None, 20)
+    labels = ["Home", "Plants", "Friends", "Add Plant", "Toggle Archives", "Back",
+              "Ask Derek the Dandelion", "Your Plants"] + [f"Plant number {i}" for i in range(20)]
+    black = pygame.Color("black")
+
+    def uncached(i):
+        for text in labels:
+            font.render(text, True, black)
+
+    cache = TextCache()
+    def cached(i):
+        for text in labels:
+            cache.render(font, text, True, black)
+
+    print(f"text rendering: {len(labels)} labels per frame")
+    report("font.render per frame", timed(uncached, frames))
+    report("TextCache per frame", timed(cached, frames))
+    print(f"  cache stats: {cache.stats()}")
+    pygame.quit()
+
+
+# --- local stand-in for the Ollama server --- #
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True   # like Ollama's Go server (TCP_NODELAY)
+    tokens = [" Water", " basil", " when", " the", " top", " inch", " of", " soil",
+              " is", " dry", ",", " about", " \"every\"", " 2-3", " days", ".\n"]
+    token_delay = 0.02
+    first_token_delay = 0.05
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        model = body.get("model", "")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            time.sleep(self.first_delay(body.get("prompt", "")))
+            for i, tok in enumerate(self.tokens):
+                if i:
+                    time.sleep(self.token_delay)
+                self._chunk(json.dumps({"model": model, "response": tok, "done": False}) + "\n")
+            self._chunk(json.dumps({"model": model, "response": "", "done": True}) + "\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # client cancelled the generation and hung up
+            self.close_connection = True
+
+    def first_delay(self, prompt):
+        return self.first_token_delay
+
+    def _chunk(self, text):
+        data = text.encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+def fake_ollama_server(handler=FakeOllamaHandler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/generate"
+
+
+# --- time to first token: streamed tokens vs waiting for the whole answer --- #
+def bench_ollama_stream(tmp, n=5):
+    from ollama_client import OllamaClient
+    server, url = fake_ollama_server()
+    client = OllamaClient(url)
+    first, full = [], []
+    for _ in range(n):
+        start = time.perf_counter()
+        answer = ""
+        for tok in client.stream("how often to water basil", "llama3"):
+            if not answer:
+                first.append(time.perf_counter() - start)
+            answer += tok
+        full.append(time.perf_counter() - start)
+    client.close()
+    server.shutdown()
+    print(f"ollama streaming (fake server, {len(FakeOllamaHandler.tokens)} tokens)")
+    print(f"  {'time to first token (streamed)':<40} {sum(first) / n * 1e3:10.1f} ms")
+    print(f"  {'time to full answer (old behaviour)':<40} {sum(full) / n * 1e3:10.1f} ms")
+    print(f"  answer: {answer!r}")
+
+
+# --- per-request overhead: new connection per call vs pooled session --- #
+class InstantOllamaHandler(FakeOllamaHandler):
+    tokens = [" ok"]
+    token_delay = 0
+    first_token_delay = 0
+
+
+def bench_ollama_session(tmp, n=300):
+    import requests
+    from ollama_client import OllamaClient
+    server, url = fake_ollama_server(InstantOllamaHandler)
+
+    def fresh_connection(i):
+        r = requests.post(url, json={"model": "llama3", "prompt": "hi"}, timeout=60, stream=True)
+        for _ in r.iter_lines():
+            pass
+        r.close()
+
+    client = OllamaClient(url)
+    def pooled(i):
+        for _ in client.stream("hi", "llama3"):
+            pass
+
+    print("ollama request overhead (fake server, 1-token answers)")
+    report("requests.post, new connection", timed(fresh_connection, n))
+    report("OllamaClient, pooled keep-alive", timed(pooled, n))
+    client.close()
+    server.shutdown()
+
+
+# --- superseded questions: a newer answer must never be overwritten --- #
+class SlowLoadOllamaHandler(FakeOllamaHandler):
+    # "slow ..." prompts wait as if the model were still loading
+    def first_delay(self, prompt):
+        return 3.0 if prompt.startswith("slow") else self.first_token_delay
+
+
+def bench_ai_supersede(tmp):
+    from ollama_client import OllamaClient, OllamaError, StreamHandle
+    from ai_worker import AIWorker
+    server, url = fake_ollama_server(SlowLoadOllamaHandler)
+    client = OllamaClient(url)
+    running = {"now": 0, "peak": 0}
+    count_lock = threading.Lock()
+
+    def run(prompt, emit, cancelled):
+        # same shape as the app's run_generation / query_ollama
+        with count_lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        try:
+            answer = ""
+            handle = StreamHandle()
+            cancelled.on_cancel(handle.abort)
+            try:
+                for token in client.stream(prompt, "llama3", handle):
+                    if cancelled():
+                        return
+                    answer += token
+                    emit("token", token)
+            except OllamaError:
+                if cancelled():
+                    return
+                raise
+            if not cancelled():
+                emit("done", answer)
+        finally:
+            with count_lock:
+                running["now"] -= 1
+
+    worker = AIWorker(run)
+    shown = {"text": ""}
+
+    def ui_frames(seconds, until=None):
+        # the app's apply_ai_results(), once per frame
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            for kind, payload in worker.poll():
+                shown["text"] = shown["text"] + payload if kind == "token" else payload
+            if until and until():
+                break
+            time.sleep(0.005)
+        return time.perf_counter() - start
+
+    print("superseded AI questions (fake server)")
+    # question A is streaming when a question with a cached answer is asked
+    worker.submit("question A")
+    ui_frames(5, until=lambda: shown["text"])
+    worker.cancel()                 # what gardening_tip_action does on a cache hit
+    shown["text"] = cached = "cached answer"
+    stream_time = len(FakeOllamaHandler.tokens) * FakeOllamaHandler.token_delay
+    ui_frames(stream_time * 2)
+    assert shown["text"] == cached, f"cached answer overwritten: {shown['text']!r}"
+    print("  cached answer asked mid-stream stays on screen")
+
+    # question A is still waiting for its first token when B is asked
+    shown["text"] = ""
+    worker.submit("slow question A")
+    time.sleep(0.1)
+    worker.submit("question B")
+    waited = ui_frames(5, until=lambda: shown["text"])
+    assert shown["text"] and waited < 1.0, f"new question blocked for {waited:.2f}s"
+    print(f"  new question's first token while the old one waits: {waited * 1e3:.0f} ms")
+    ui_frames(3.5)
+    assert shown["text"].startswith(" Water") and shown["text"].count("Water") == 1, shown["text"]
+
+    # ten questions in quick succession, each one still loading when the next comes
+    shown["text"] = ""
+    running["peak"] = 0
+    for i in range(9):
+        worker.submit(f"slow question {i}")
+        time.sleep(0.02)
+    worker.submit("question 10")
+    waited = ui_frames(5, until=lambda: shown["text"])
+    assert running["peak"] == 1, f"{running['peak']} generations ran at once"
+    assert shown["text"] and waited < 1.0, f"last question waited {waited:.2f}s"
+    print(f"  10 quick questions: at most {running['peak']} generation at once, "
+          f"last one's first token after {waited * 1e3:.0f} ms")
+
+    worker.stop()
+    client.close()
+    server.shutdown()
+
+
+# --- plant edit: full reload + JSON rewrite vs repository delta --- #
+def make_plant_db(path, plants=50000):
+    from plant_repository import PlantRepository
+    store = DataStore(path)
+    repo = PlantRepository(store)
+    repo.setup()
+    with store.transaction() as cur:
+        cur.executemany("INSERT INTO plants(name,age,shade,notes,photo,archived,source_json) VALUES(?,?,?,?,?,?,1)",
+                        ((f"Plant {i}", f"{i % 12} months", i % 2, f"notes for plant {i}", None, 1 if i % 10 == 0 else 0)
+                         for i in range(plants)))
+    return store, repo
+
+
+def bench_plant_edit(tmp, plants=50000, n=20):
+    from plant_repository import row_to_plant, plant_params
+    store, repo = make_plant_db(os.path.join(tmp, "plants.db"), plants)
+    json_path = os.path.join(tmp, "plants.json")
+
+    def full_reload(i):
+        plant = {"name": f"Edited {i}", "age": "1", "shade": True, "notes": f"edit {i}", "photo": None, "archived": False}
+        store.execute("UPDATE plants SET name=?,age=?,shade=?,notes=?,photo=?,archived=?,source_json=0 WHERE id=?",
+                      plant_params(plant) + (i + 1,))
+        rows = store.fetchall("SELECT id,name,age,shade,notes,photo,archived FROM plants ORDER BY id DESC")
+        everything = [row_to_plant(r) for r in rows]
+        with open(json_path, "w") as f:
+            json.dump(everything, f, indent=2)
+
+    repo.load()
+    def repo_delta(i):
+        repo.update(i + 1, {"name": f"Edited {i}", "age": "1", "shade": True, "notes": f"repo {i}", "photo": None, "archived": False})
+
+    def repo_add_delete(i):
+        repo.delete(repo.add({"name": f"New {i}", "notes": f"new {i}"})["id"])
+
+    print(f"plant edit cost with {plants} plants")
+    report("update + reload + JSON rewrite", timed(full_reload, n))
+    report("repository update (row delta)", timed(repo_delta, n * 50))
+    report("repository add + delete", timed(repo_add_delete, n * 50))
+    store.close()
+
+
+# --- plants.json import: json.load + row-by-row vs streaming executemany --- #
+def write_plants_json(path, plants):
+    with open(path, "w") as f:
+        f.write("[")
+        for i in range(plants):
+            if i:
+                f.write(",")
+            json.dump({"id": i, "name": f"Plant {i}", "age": f"{i % 12} months", "shade": i % 2 == 0,
+                       "notes": f"notes for plant {i} " + "x" * 100, "photo": None, "archived": False}, f, indent=2)
+        f.write("]")
+
+
+def bench_plant_import(tmp, plants=100000):
+    from plant_repository import PlantRepository
+    from plant_import import import_plants
+    path = os.path.join(tmp, "plants.json")
+    write_plants_json(path, plants)
+    size_mb = os.path.getsize(path) / 1e6
+
+    def fresh_store(name):
+        store = DataStore(os.path.join(tmp, name))
+        PlantRepository(store).setup()
+        return store
+
+    def old_import():
+        with open(path) as f:
+            everything = json.load(f)
+        conn = sqlite3.connect(os.path.join(tmp, "old.db"))
+        conn.execute("CREATE TABLE plants(id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, age TEXT, shade INTEGER, notes TEXT, "
+                     "photo TEXT, archived INTEGER DEFAULT 0, source_json INTEGER DEFAULT 0, UNIQUE(name, notes))")
+        for p in everything:
+            conn.execute("INSERT OR IGNORE INTO plants(name,age,shade,notes,photo,archived,source_json) VALUES(?,?,?,?,?,?,1)",
+                         (p.get('name'), p.get('age'), 1 if p.get('shade') else 0, p.get('notes'), p.get('photo'), 1 if p.get('archived') else 0))
+        conn.commit(); conn.close()
+        return f"{len(everything)} rows"
+
+    def measure(fn):
+        # timed run first, then a traced run for peak memory (tracing is slow)
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+        for f in os.listdir(tmp):
+            if f.endswith(".db"):
+                os.remove(os.path.join(tmp, f))
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return result, seconds, peak
+
+    print(f"plants.json import: {plants} records, {size_mb:.0f} MB")
+    for label, fn in (("json.load + execute per row", old_import),
+                      ("streaming + chunked executemany", lambda: import_plants(fresh_store("new.db"), path))):
+        result, seconds, peak = measure(fn)
+        print(f"  {label:<40} {seconds:8.2f} s  peak {peak / 1e6:8.1f} MB  ({result})")
+
+
+# --- startup sync: unconditional import/reload/export vs checkpoint --- #
+def bench_startup_sync(tmp, plants=100000):
+    from plant_repository import PlantRepository
+    from plant_import import import_plants
+    from plant_sync import PlantSync
+    from snapshot_writer import write_atomic, encode_snapshot
+    json_path = os.path.join(tmp, "plants.json")
+    write_plants_json(json_path, plants)
+    store = DataStore(os.path.join(tmp, "app.db"))
+    repo, sync = PlantRepository(store), PlantSync(store, json_path)
+    repo.setup(); sync.setup()
+
+    def export():
+        rows = sync.export_rows(repo.export_rows)
+        write_atomic(json_path, encode_snapshot(rows))
+        sync.record_export()
+
+    def old_startup():
+        import_plants(store, json_path)
+        repo.load()
+        with open(json_path, "w") as f:
+            json.dump(repo.snapshot(), f, indent=2)
+
+    def checkpoint_startup():
+        if sync.file_changed():
+            import_plants(store, json_path)
+            sync.record_import()
+        repo.load()
+        if sync.needs_export():
+            export()
+
+    def run(fn):
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+
+    print(f"startup sync with {plants} plants")
+    print(f"  {'first run (import + export)':<40} {run(checkpoint_startup):8.2f} s")
+    print(f"  {'old: import + reload + export, always':<40} {run(old_startup):8.2f} s")
+    export()
+    print(f"  {'checkpoint, nothing changed':<40} {run(checkpoint_startup):8.2f} s")
+    os.utime(json_path)
+    print(f"  {'checkpoint, file touched not edited':<40} {run(checkpoint_startup):8.2f} s")
+    repo.update(1, {"name": "Edited", "notes": "edited"})
+    print(f"  {'checkpoint, one row edited in DB':<40} {run(checkpoint_startup):8.2f} s")
+    store.close()
+
+
+# --- plants screen frame: draw every row vs virtualized list --- #
+def bench_plant_list(tmp, frames=30):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from virtual_list import VirtualList
+    from text_cache import TextCache
+    pygame.init()
+    screen = pygame.Surface((360, 650))
+    font = pygame.font.SysFont(None, 20)
+    cache = TextCache()
+
+    def draw_row(sc, plant, r):
+        pygame.draw.rect(sc, (180, 220, 180), r, border_radius=6)
+        sc.blit(cache.render(font, plant["name"], True, (0, 0, 0)), (r.x + 10, r.y + 10))
+
+    print("plants screen frame time by plant count")
+    for count in (100, 10000, 100000):
+        plants = [{"name": f"Plant {i}", "archived": i % 10 == 0} for i in range(count)]
+
+        def draw_all(i):
+            for j, plant in enumerate(plants):
+                if plant["archived"]:
+                    continue
+                draw_row(screen, plant, pygame.Rect(30, 90 + j * 50, 200, 40))
+
+        view = VirtualList((30, 95, 200, 125))
+        view.set_items([p for p in plants if not p["archived"]])
+        def draw_virtual(i):
+            view.scroll(37)
+            view.draw(screen, draw_row)
+
+        report(f"{count:>6} plants, draw every row", timed(draw_all, max(1, frames * 100 // count)))
+        report(f"{count:>6} plants, virtualized", timed(draw_virtual, frames))
+    pygame.quit()
+
+
+# --- archive toggle: filter the whole list vs pre-partitioned views --- #
+def bench_plant_partitions(tmp, plants=100000, n=20):
+    store, repo = make_plant_db(os.path.join(tmp, "plants.db"), plants)
+    repo.load()
+
+    def filtered(i):
+        archived = bool(i % 2)
+        items = [p for p in repo.newest_first() if p['archived'] == archived]
+        return items[0]
+
+    def partitioned(i):
+        return repo.view(bool(i % 2))[0]
+
+    def archive_one(i):
+        plant = dict(repo.view(False)[i])
+        plant['archived'] = True
+        repo.update(plant['id'], plant)
+
+    print(f"archive toggle with {plants} plants ({repo.count(True)} archived)")
+    report("filter whole list on toggle", timed(filtered, n))
+    report("pre-partitioned view", timed(partitioned, n * 100))
+    report("archive one plant (moves partition)", timed(archive_one, n))
+    plan = store.fetchall("EXPLAIN QUERY PLAN SELECT id FROM plants WHERE archived=? ORDER BY id", (1,))
+    print("  load query plan:", "; ".join(row[-1] for row in plan))
+    store.close()
+
+
+# --- checklist clicks: rebuild every row's rects vs retained layout --- #
+def bench_hit_test(tmp, n=2000):
+    import random
+    import pygame
+    from ui_layout import Layout
+    area = pygame.Rect(20, 100, 320, 400)
+    print("checklist click dispatch by row count")
+    for rows in (10, 1000, 10000):
+        def build(layout):
+            nodes = []
+            for i in range(rows):
+                y = area.y + 10 + i * 45
+                nodes += [layout.node((area.x + 10, y, 22, 22), ("toggle", i)),
+                          layout.node((area.x + 42, y, 200, 22), ("edit", i)),
+                          layout.node((area.right - 35, y, 25, 25), ("delete", i))]
+            return layout.node(area, None, nodes)
+        layout = Layout(build).update(rows)
+        clicks = [(random.randrange(area.x, area.right), random.randrange(area.y, area.y + rows * 45))
+                  for _ in range(n)]
+
+        def rebuild_rects(i):
+            pos = clicks[i]
+            for j in range(rows):
+                y = area.y + 10 + j * 45
+                box = pygame.Rect(area.x + 10, y, 22, 22)
+                if box.collidepoint(pos) or pygame.Rect(box.right + 10, y, 200, 22).collidepoint(pos) \
+                        or pygame.Rect(area.right - 35, y, 25, 25).collidepoint(pos):
+                    return j
+
+        report(f"{rows:>5} rows, rebuild rects per click", timed(rebuild_rects, max(1, n * 10 // rows)))
+        report(f"{rows:>5} rows, retained layout + grid", timed(lambda i: layout.hit(clicks[i]), n))
+
+
+# --- password KDF cost: pick the highest setting that stays under budget --- #
+def bench_password_kdf(tmp, budget_ms=100):
+    import passwords
+    salt = os.urandom(passwords.SALT_BYTES)
+
+    def ms(fn, n=3):
+        return timed(lambda i: fn(), n) * 1000
+
+    print(f"password hash cost (budget {budget_ms} ms per login; current {passwords.SCHEME})")
+    print(f"  {'legacy sha256':<40} {ms(lambda: hashlib.sha256(b'pw').hexdigest(), 1000):10.3f} ms")
+    if hasattr(hashlib, "scrypt"):
+        best = None
+        for log_n in range(12, 18):
+            n = 1 << log_n
+            cost = ms(lambda: passwords._scrypt("pw", salt, n, passwords.SCRYPT_R, passwords.SCRYPT_P))
+            print(f"  {f'scrypt n=2^{log_n} r={passwords.SCRYPT_R}':<40} {cost:10.1f} ms")
+            if cost <= budget_ms:
+                best = log_n
+        if best:
+            print(f"  -> SCRYPT_N = 1 << {best}")
+    best = None
+    for iterations in (100_000, 200_000, 400_000, 600_000, 1_000_000):
+        cost = ms(lambda: passwords._pbkdf2("pw", salt, iterations))
+        print(f"  {f'pbkdf2_sha256 {iterations} iterations':<40} {cost:10.1f} ms")
+        if cost <= budget_ms:
+            best = iterations
+    if best:
+        print(f"  -> PBKDF2_ITERATIONS = {best}")
+
+
+# --- friends screen: full list + slice vs keyset page --- #
+def bench_friend_pages(tmp, friends=5000, n=200):
+    from friend_cache import FriendPager
+    from migrations import migrate
+    from social import SocialRepository
+    store = DataStore(os.path.join(tmp, "friends.db"))
+    with store.transaction() as cur:
+        # the pygame app's old tables, moved into the social schema by migrate()
+        cur.execute("CREATE TABLE userdata(id INTEGER PRIMARY KEY, username TEXT UNIQUE NOT NULL, password TEXT NOT NULL)")
+        cur.execute("CREATE TABLE friends(user1 TEXT NOT NULL, user2 TEXT NOT NULL, UNIQUE(user1, user2))")
+        cur.executemany("INSERT INTO userdata(username, password) VALUES(?,?)",
+                        ((name, "x") for name in ["me"] + [f"user{i:06d}" for i in range(friends)] +
+                         [f"other{i}" for i in range(friends * 10)]))
+        cur.executemany("INSERT INTO friends VALUES(?,?)",
+                        (tuple(sorted(("me", f"user{i:06d}"))) for i in range(friends)))
+        cur.executemany("INSERT INTO friends VALUES(?,?)",
+                        ((f"other{i}", f"user{i % friends:06d}") for i in range(friends * 10)))
+    migrate(store)
+    social = SocialRepository(store)
+
+    def full_list(i):
+        everyone = social.friends("me")
+        return everyone[(i % 100) * 5:(i % 100) * 5 + 5], len(everyone)
+
+    pager = FriendPager(social.friends_page, social.count_friends)
+    pager.sync("me", 0)
+
+    def keyset(i):
+        pager.sync("me", 0)     # per frame: no query unless something changed
+        pager.next()
+
+    print(f"friends screen, user with {friends} friends")
+    report("old: full list + slice, every frame", timed(full_list, n))
+    report("keyset page turn (social.friends_page)", timed(keyset, n))
+    report("frame with no change", timed(lambda i: pager.sync("me", 0), n * 100))
+    # a friend added/removed elsewhere: count_friends + the current page again
+    report("frame after a friendship change", timed(lambda i: pager.sync("me", i + 1), n))
+    store.close()
+
+
+# --- friend suggestions on a large synthetic graph --- #
+def bench_suggestions(tmp, users=100000, edges=1000000, n=200):
+    import random
+    from friend_cache import FriendGraph
+    from friend_suggestions import SuggestionIndex
+    rng = random.Random(7)
+    adj = [set() for _ in range(users)]
+    pairs = set()
+    while len(pairs) < edges:
+        a, b = rng.randrange(users), rng.randrange(users)
+        if a != b:
+            pairs.add((min(a, b), max(a, b)))
+    for a, b in pairs:
+        adj[a].add(b); adj[b].add(a)
+    viewers = [rng.randrange(users) for _ in range(n)]
+    print(f"friend suggestions, {users} users / {edges} friendships")
+
+    # indexed SQL two-hop, one grouped query per viewer
+    store = DataStore(os.path.join(tmp, "graph.db"))
+    store.execute("CREATE TABLE edges(a INTEGER, b INTEGER, PRIMARY KEY(a, b)) WITHOUT ROWID")
+    with store.transaction() as cur:
+        cur.executemany("INSERT INTO edges VALUES(?,?)", ((a, b) for a, b in pairs))
+        cur.executemany("INSERT INTO edges VALUES(?,?)", ((b, a) for a, b in pairs))
+    sql = ("SELECT e2.b, COUNT(*) AS mutual FROM edges e1 JOIN edges e2 ON e2.a = e1.b "
+           "WHERE e1.a = ? AND e2.b != ? AND e2.b NOT IN (SELECT b FROM edges WHERE a = ?) "
+           "GROUP BY e2.b ORDER BY mutual DESC, e2.b LIMIT 5")
+    report("SQL two-hop GROUP BY per request", timed(lambda i: store.fetchall(sql, (viewers[i],) * 3), n))
+    store.close()
+
+    graph = FriendGraph(lambda u: adj[u])
+    report("in-memory index build (first view)", timed(lambda i: SuggestionIndex(graph, viewers[i]).close(), n))
+    index = SuggestionIndex(graph, viewers[0])
+    report("top 5 from a built index (cached)", timed(lambda i: index.top(5), n * 100))
+
+    # a typical user, and a "hub" with 2000 friends, where rebuilds hurt
+    hub = viewers[1]
+    for b in rng.sample(range(users), 2000):
+        if b != hub and b not in adj[hub]:
+            adj[hub].add(b); adj[b].add(hub); graph.add_edge(hub, b)
+    for label, me in (("typical", viewers[0]), ("hub", hub)):
+        index = SuggestionIndex(graph, me)
+        friends = sorted(graph.friends_of(me))
+
+        def change(i):
+            # a friend of mine gains a friend and loses it again; then I do
+            other = rng.randrange(users)
+            for a in (friends[i % len(friends)], me):
+                if other in adj[a] or other in (a, me):
+                    continue
+                adj[a].add(other); adj[other].add(a); graph.add_edge(a, other)
+                adj[a].discard(other); adj[other].discard(a); graph.remove_edge(a, other)
+
+        report(f"{label}: 4 edge changes, incremental", timed(change, n))
+        report(f"{label}: one rebuild from scratch", timed(lambda i: index.rebuild(), 20))
+        report(f"{label}: re-rank top 5 after a change", timed(lambda i: (index._changed(), index.top(5)), 20))
+        index.close()
+
+    index = SuggestionIndex(graph, hub)
+    change(0)
+    print("  incremental counts match a rebuild:", SuggestionIndex(graph, hub).counts == index.counts)
+
+
+# --- AccountV2 friends menu: old friends(user_id, friend_id, status) vs social.py --- #
+def bench_friends_menu(tmp, users=10000, friendships=100000, n=50):
+    import random
+    from migrations import migrate
+    from social import SocialRepository
+    random.seed(1)
+    store = DataStore(os.path.join(tmp, "friends_menu.db"))
+    with store.transaction() as cur:
+        # AccountV2's tables as they were before the social schema
+        cur.execute("CREATE TABLE userdata(id INTEGER PRIMARY KEY, username TEXT UNIQUE NOT NULL, password TEXT NOT NULL)")
+        cur.execute("CREATE TABLE friends(id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, friend_id INTEGER NOT NULL, "
+                    "status TEXT NOT NULL CHECK(status IN ('pending','accepted')))")
+        cur.executemany("INSERT INTO userdata(id, username, password) VALUES(?,?,?)",
+                        ((i, f"user{i}", "x") for i in range(1, users + 1)))
+        pairs = set()
+        while len(pairs) < friendships:
+            a, b = random.sample(range(1, users + 1), 2)
+            if (b, a) not in pairs:
+                pairs.add((a, b))
+        cur.executemany("INSERT INTO friends(user_id, friend_id, status) VALUES(?,?,?)",
+                        ((a, b, "pending" if k % 10 == 0 else "accepted") for k, (a, b) in enumerate(pairs)))
+    names = [f"user{random.randint(1, users)}" for _ in range(n)]
+
+    def user_id(name):
+        return store.fetchone("SELECT id FROM userdata WHERE username = ?", (name,))[0]
+
+    def old_menu(i):
+        # view_friends + count_requests as AccountV2 ran them
+        uid = user_id(names[i])
+        store.fetchall("""SELECT u.username FROM friends f
+            JOIN userdata u ON (u.id = f.user_id OR u.id = f.friend_id)
+            WHERE (f.user_id = ? OR f.friend_id = ?) AND f.status = 'accepted' AND u.id != ?""", (uid, uid, uid))
+        store.fetchone("SELECT COUNT(*) FROM friends WHERE friend_id = ? AND status = 'pending'", (uid,))
+        store.fetchone("SELECT COUNT(*) FROM friends WHERE user_id = ? AND status = 'pending'", (uid,))
+
+    def old_requests(i):
+        store.fetchall("""SELECT u.username FROM friends f JOIN userdata u ON f.user_id = u.id
+            WHERE f.friend_id = ? AND f.status = 'pending'""", (user_id(names[i]),))
+
+    print(f"AccountV2 friends menu, {users} users, {friendships} friendships")
+    report("old: friends list + 2 counts", timed(old_menu, n))
+    report("old: incoming requests", timed(old_requests, n))
+
+    start = time.perf_counter()
+    migrate(store)
+    print(f"  migrate to the social schema: {time.perf_counter() - start:.2f}s")
+    social = SocialRepository(store)
+
+    def new_menu(i):
+        social.friends(names[i % n])
+        social.request_counts(names[i % n])
+
+    report("friends list + grouped counts", timed(new_menu, n * 10))
+    report("incoming requests", timed(lambda i: social.incoming_requests(names[i % n]), n * 10))
+    store.close()
+
+
+# --- accept a batch of friend requests: one transaction each vs executemany --- #
+def bench_bulk_requests(tmp, senders=500):
+    from social import SocialRepository
+    store = DataStore(os.path.join(tmp, "bulk.db"))
+    social = SocialRepository(store)
+    social.setup()
+    with store.transaction():
+        for i in range(senders * 2):
+            social.create_user(f"user{i}", "x")
+    social.create_user("me", "x")
+    first, second = [f"user{i}" for i in range(senders)], [f"user{i}" for i in range(senders, senders * 2)]
+
+    def one_by_one():
+        for name in first:
+            social.accept_request(name, "me")
+
+    def batch():
+        social.accept_requests("me", second)
+
+    print(f"accepting {senders} friend requests")
+    for label, names, run in (("one transaction per request", first, one_by_one),
+                              ("accept_requests (one transaction)", second, batch)):
+        for name in names:
+            social.send_request(name, "me")
+        start = time.perf_counter()
+        run()
+        report(label, (time.perf_counter() - start) / senders)
+    store.close()
+
+
+BENCHMARKS = {
+    "datastore": bench_datastore,
+    "idle_cpu": bench_idle_cpu,
+    "text_cache": bench_text_cache,
+    "ollama_stream": bench_ollama_stream,
+    "ollama_session": bench_ollama_session,
+    "ai_supersede": bench_ai_supersede,
+    "plant_edit": bench_plant_edit,
+    "plant_import": bench_plant_import,
+    "startup_sync": bench_startup_sync,
+    "plant_list": bench_plant_list,
+    "plant_partitions": bench_plant_partitions,
+    "hit_test": bench_hit_test,
+    "password_kdf": bench_password_kdf,
+    "friend_pages": bench_friend_pages,
+    "suggestions": bench_suggestions,
+    "friends_menu": bench_friends_menu,
+    "bulk_requests": bench_bulk_requests,
+}
+
+def main(names):
+    for name in names or BENCHMARKS:
+        with tempfile.TemporaryDirectory() as tmp:
+            BENCHMARKS[name](tmp)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
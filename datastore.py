@@ -0,0 +1,109 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# ------------------ Shared SQLite Data Store ------------------ #
+# One long-lived connection per thread and database file, instead of a
+# connect/close cycle on every call. Threads (the UI loop and any worker)
+# each get their own connection, so nothing is shared across threads.
+# A worker thread calls release() before it exits to close its own.
+
+DB_FILE = "appdata.db"
+STATEMENT_CACHE_SIZE = 256
+
+
+class DataStore:
+    def __init__(self, db_file=DB_FILE):
+        self.db_file = db_file
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: we issue BEGIN/COMMIT ourselves in transaction()
+            conn = sqlite3.connect(self.db_file, isolation_level=None,
+                                   check_same_thread=False,
+                                   cached_statements=STATEMENT_CACHE_SIZE)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    # --- queries --- #
+    def execute(self, sql, params=()):
+        return self.connection().execute(sql, params)
+
+    def executemany(self, sql, seq):
+        return self.connection().executemany(sql, seq)
+
+    def fetchone(self, sql, params=()):
+        return self.connection().execute(sql, params).fetchone()
+
+    def fetchall(self, sql, params=()):
+        return self.connection().execute(sql, params).fetchall()
+
+    def column(self, sql, params=()):
+        return [r[0] for r in self.connection().execute(sql, params)]
+
+    # --- transactions --- #
+    @contextmanager
+    def transaction(self, immediate=True):
+        # Nested scopes join the outermost one; only it commits or rolls back.
+        # immediate=False starts a deferred (read) transaction: under WAL it
+        # reads a consistent snapshot without holding up writers.
+        conn = self.connection()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            self._local.depth = 0
+
+    def release(self):
+        # close the calling thread's connection; worker threads call this
+        # before they exit so their connection doesn't outlive them
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        self._local.conn = None
+        self._local.depth = 0
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            conns, self._connections = self._connections, []
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store(db_file=DB_FILE):
+    with _stores_lock:
+        store = _stores.get(db_file)
+        if store is None:
+            store = _stores[db_file] = DataStore(db_file)
+        return store
@@ -0,0 +1,179 @@
+# ------------------ Friend Request Cache ------------------ #
+# In-memory copy of the logged-in user's pending requests so the UI can
+# show counts and lists without querying the database every frame.
+# Loaded once on login, then kept in step by the functions that add or
+# remove requests. Dicts are used as ordered sets (O(1) add/remove,
+# original order preserved for display).
+
+class RequestCache:
+    def __init__(self):
+        self.user = None
+        self.incoming = {}
+        self.outgoing = {}
+
+    def load(self, user, incoming, outgoing):
+        self.user = user
+        self.incoming = dict.fromkeys(incoming)
+        self.outgoing = dict.fromkeys(outgoing)
+
+    def clear(self):
+        self.user = None
+        self.incoming = {}
+        self.outgoing = {}
+
+    def request_added(self, sender, receiver):
+        if self.user is None:
+            return
+        if sender == self.user:
+            self.outgoing[receiver] = None
+        elif receiver == self.user:
+            self.incoming[sender] = None
+
+    def request_removed(self, sender, receiver):
+        if self.user is None:
+            return
+        if sender == self.user:
+            self.outgoing.pop(receiver, None)
+        elif receiver == self.user:
+            self.incoming.pop(sender, None)
+
+    def incoming_count(self):
+        return len(self.incoming)
+
+    def outgoing_count(self):
+        return len(self.outgoing)
+
+
+# ------------------ Friend Graph ------------------ #
+# Adjacency sets for the users whose friend lists have been looked at, so
+# "friends of", "are friends" and degree are set operations instead of a
+# UNION over the friends table on every frame. A user's set is loaded
+# from the database the first time it is needed (load_friends(user)) and
+# after that kept in step by add_edge/remove_edge, which the data
+# functions call whenever they change a friendship. Edges touching users
+# that haven't been loaded are skipped; those users read the table when
+# they are first asked for. Listeners (subscribe) hear about every edge
+# change that touched a loaded user, after the sets have been updated.
+
+class FriendGraph:
+    def __init__(self, load_friends):
+        self._load_friends = load_friends
+        self._adj = {}
+        self._listeners = []
+        self.version = 0    # bumped on every edge change, for redraw checks
+
+    def subscribe(self, listener):
+        # listener(a, b, added)
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _friends(self, user):
+        friends = self._adj.get(user)
+        if friends is None:
+            friends = self._adj[user] = set(self._load_friends(user))
+        return friends
+
+    def friends_of(self, user):
+        return self._friends(user)
+
+    def are_friends(self, a, b):
+        if a in self._adj or b not in self._adj:
+            return b in self._friends(a)
+        return a in self._adj[b]
+
+    def degree(self, user):
+        return len(self._friends(user))
+
+    def add_edge(self, a, b):
+        changed = False
+        for u, v in ((a, b), (b, a)):
+            if u in self._adj and v not in self._adj[u]:
+                self._adj[u].add(v)
+                changed = True
+        self.version += 1
+        if changed:
+            for listener in self._listeners:
+                listener(a, b, True)
+
+    def remove_edge(self, a, b):
+        changed = False
+        for u, v in ((a, b), (b, a)):
+            if u in self._adj and v in self._adj[u]:
+                self._adj[u].discard(v)
+                changed = True
+        self.version += 1
+        if changed:
+            for listener in self._listeners:
+                listener(a, b, False)
+
+    def clear(self):
+        self._adj.clear()
+        self.version += 1
+
+
+# ------------------ Friend List Pager ------------------ #
+# Keyset pagination over one user's friends, ordered by name: a page is
+# "the next page_size names after <key>", so every page costs the same
+# index range scan however far in it is, and nothing outside the visible
+# page is read. The start key of each visited page is kept on a stack
+# for going back. The total is counted once and re-counted only when
+# the friendships change (sync() is given the friend graph's version).
+#
+#   fetch_page(user, after, limit) -> names > after (after=None: from start)
+#   count(user)                    -> number of friends
+
+class FriendPager:
+    def __init__(self, fetch_page, count, page_size=5):
+        self._fetch_page = fetch_page
+        self._count = count
+        self.page_size = page_size
+        self.user = None
+        self.items = []
+        self.total = 0
+        self._starts = [None]   # key each visited page starts after
+        self._version = None
+
+    @property
+    def page(self):
+        return len(self._starts) - 1
+
+    @property
+    def total_pages(self):
+        return max((self.total + self.page_size - 1) // self.page_size, 1)
+
+    def has_prev(self):
+        return self.page > 0
+
+    def has_next(self):
+        return self.page < self.total_pages - 1
+
+    def sync(self, user, version):
+        # call every frame; only touches the database on a change
+        if user != self.user:
+            self.user = user
+            self._starts = [None]
+            self._version = None
+        if version != self._version:
+            self._version = version
+            self._reload()
+
+    def _reload(self):
+        self.total = self._count(self.user) if self.user else 0
+        self.items = self._fetch_page(self.user, self._starts[-1], self.page_size) if self.user else []
+        while not self.items and len(self._starts) > 1:
+            # the last page emptied (friends removed): step back
+            self._starts.pop()
+            self.items = self._fetch_page(self.user, self._starts[-1], self.page_size)
+
+    def next(self):
+        if self.items and self.has_next():
+            self._starts.append(self.items[-1])
+            self.items = self._fetch_page(self.user, self._starts[-1], self.page_size)
+
+    def prev(self):
+        if self.has_prev():
+            self._starts.pop()
+            self.items = self._fetch_page(self.user, self._starts[-1], self.page_size)
@@ -0,0 +1,90 @@
+import heapq
+
+# ------------------ People You May Know ------------------ #
+# Suggests friends-of-friends for one user, ranked by how many friends
+# they have in common. The mutual-friend counts are built once with a
+# two-hop walk over the FriendGraph's adjacency sets:
+#     for each friend f:  for each friend g of f:  counts[g] += 1
+# and then kept up to date edge by edge (the index subscribes to the
+# graph), so a new or removed friendship costs at most one friend list
+# walk instead of a rebuild. top(k) ranks the current counts, and is
+# cached until the counts change.
+#
+# Counts stay correct because every user they depend on (the viewer and
+# the viewer's friends) has its adjacency set loaded in the graph, so
+# the graph reports every change that matters.
+
+class SuggestionIndex:
+    def __init__(self, graph, user):
+        self.graph = graph
+        self.user = user
+        self.counts = {}
+        self.version = 0
+        self._top = {}
+        self.rebuild()
+        graph.subscribe(self.edge_changed)
+
+    def close(self):
+        self.graph.unsubscribe(self.edge_changed)
+
+    def _friends(self):
+        return self.graph.friends_of(self.user)
+
+    def _is_candidate(self, x, friends):
+        return x != self.user and x not in friends
+
+    def rebuild(self):
+        friends = self._friends()
+        counts = {}
+        for f in friends:
+            for g in self.graph.friends_of(f):
+                if self._is_candidate(g, friends):
+                    counts[g] = counts.get(g, 0) + 1
+        self.counts = counts
+        self._changed()
+
+    def _changed(self):
+        self.version += 1
+        self._top.clear()
+
+    def _bump(self, x, delta):
+        n = self.counts.get(x, 0) + delta
+        if n > 0:
+            self.counts[x] = n
+        else:
+            self.counts.pop(x, None)
+
+    def edge_changed(self, a, b, added):
+        friends = self._friends()
+        delta = 1 if added else -1
+        if self.user in (a, b):
+            other = b if a == self.user else a
+            # everyone `other` knows gains/loses a mutual friend with us
+            for g in self.graph.friends_of(other):
+                if self._is_candidate(g, friends):
+                    self._bump(g, delta)
+            if added:
+                self.counts.pop(other, None)
+            else:
+                mutual = len(self.graph.friends_of(other) & friends)
+                if mutual:
+                    self.counts[other] = mutual
+        else:
+            for f, g in ((a, b), (b, a)):
+                if f in friends and self._is_candidate(g, friends):
+                    self._bump(g, delta)
+        self._changed()
+
+    def mutual_count(self, other):
+        return self.counts.get(other, 0)
+
+    def top(self, k=5, exclude=()):
+        # [(user, mutual friends)], most mutual friends first, then by name
+        key = (k, tuple(exclude))
+        ranked = self._top.get(key)
+        if ranked is None:
+            skip = set(exclude)
+            ranked = heapq.nsmallest(k, ((u, n) for u, n in self.counts.items() if u not in skip),
+                                     key=lambda item: (-item[1], item[0]))
+            self._top[key] = ranked
+        return ranked
@@ -0,0 +1,201 @@
+import os
+from contextlib import contextmanager
+
+# ------------------ Schema Migrations ------------------ #
+# Versioned, resumable schema changes for appdata.db. schema_version
+# records which migrations have run; migrate() applies the missing ones
+# in order. Each migration is idempotent (CREATE ... IF NOT EXISTS,
+# INSERT OR IGNORE).
+#
+# Data is copied in batches, one transaction per batch. A batch commits
+# together with its position (last source rowid) in migration_progress,
+# so an interrupted migration picks up after the last committed batch
+# instead of starting over or holding one huge write transaction.
+#
+# The legacy tables (AccountV2's friends(user_id, friend_id, status), the
+# pygame app's friends(user1, user2)/requests(sender, receiver), and
+# AccountV1's userdata.db with its accounts, friends and friendships
+# tables) are read but left in place.
+
+BATCH_SIZE = 5000
+LEGACY_USERS_DB = "userdata.db"
+
+
+def _columns(conn, table, schema="main"):
+    return {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")}
+
+
+def current_version(store):
+    store.execute("""CREATE TABLE IF NOT EXISTS schema_version(
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )""")
+    store.execute("""CREATE TABLE IF NOT EXISTS migration_progress(
+        step TEXT PRIMARY KEY,
+        last_rowid INTEGER NOT NULL
+    )""")
+    return store.fetchone("SELECT COALESCE(MAX(version), 0) FROM schema_version")[0]
+
+
+def copy_in_batches(store, step, select_sql, copy_rows, batch_size=BATCH_SIZE):
+    # select_sql: first column is the source rowid; takes (after rowid, limit)
+    # copy_rows(conn, rows): writes one batch inside its transaction
+    row = store.fetchone("SELECT last_rowid FROM migration_progress WHERE step=?", (step,))
+    last = row[0] if row else 0
+    copied = 0
+    while True:
+        with store.transaction() as conn:
+            rows = conn.execute(select_sql, (last, batch_size)).fetchall()
+            if not rows:
+                break
+            copy_rows(conn, rows)
+            last = rows[-1][0]
+            conn.execute("INSERT OR REPLACE INTO migration_progress(step, last_rowid) VALUES(?,?)", (step, last))
+        copied += len(rows)
+    return copied
+
+
+# --- 1: integer-keyed social schema --- #
+def create_social_schema(store, batch_size):
+    with store.transaction() as conn:
+        conn.execute("""CREATE TABLE IF NOT EXISTS userdata(
+            id INTEGER PRIMARY KEY,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL
+        )""")
+        # One row per direction, so "friends of X" is one index range.
+        # friend_name repeats the friend's username (usernames never
+        # change) so a friend list can be paged by name from the index.
+        conn.execute("""CREATE TABLE IF NOT EXISTS friendships(
+            user_id INTEGER NOT NULL REFERENCES userdata(id) ON DELETE CASCADE,
+            friend_id INTEGER NOT NULL REFERENCES userdata(id) ON DELETE CASCADE,
+            friend_name TEXT NOT NULL,
+            PRIMARY KEY(user_id, friend_id)
+        ) WITHOUT ROWID""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_friendships_name ON friendships(user_id, friend_name)")
+        conn.execute("""CREATE TABLE IF NOT EXISTS friend_requests(
+            id INTEGER PRIMARY KEY,
+            sender_id INTEGER NOT NULL REFERENCES userdata(id) ON DELETE CASCADE,
+            receiver_id INTEGER NOT NULL REFERENCES userdata(id) ON DELETE CASCADE,
+            UNIQUE(sender_id, receiver_id)
+        )""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_friend_requests_receiver ON friend_requests(receiver_id)")
+
+
+def _add_friendship_rows(conn, pairs):
+    # pairs: (a_id, a_name, b_id, b_name) -> both directions
+    conn.executemany("INSERT OR IGNORE INTO friendships(user_id, friend_id, friend_name) VALUES(?,?,?)",
+                     [(a, b, b_name) for a, a_name, b, b_name in pairs] +
+                     [(b, a, a_name) for a, a_name, b, b_name in pairs])
+
+
+def _copy_status_rows(conn, rows):
+    # rows: (rowid, a id, a name, b id, b name, 'accepted'/'pending' a -> b)
+    _add_friendship_rows(conn, [(a, a_name, b, b_name) for _, a, a_name, b, b_name, status in rows
+                                if status == "accepted"])
+    # a request between users who are already friends is moot
+    conn.executemany("""INSERT OR IGNORE INTO friend_requests(sender_id, receiver_id)
+        SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM friendships WHERE user_id = ? AND friend_id = ?)""",
+                     [(a, b, a, b) for _, a, _, b, _, status in rows if status == "pending"])
+
+
+# --- 2: AccountV2's friends(user_id, friend_id, status) --- #
+def import_id_friends(store, batch_size):
+    if not {"user_id", "friend_id", "status"} <= _columns(store.connection(), "friends"):
+        return
+    copy_in_batches(store, "friends_by_id", """
+        SELECT f.rowid, u.id, u.username, v.id, v.username, f.status
+        FROM friends f JOIN userdata u ON u.id = f.user_id JOIN userdata v ON v.id = f.friend_id
+        WHERE f.rowid > ? AND u.id != v.id ORDER BY f.rowid LIMIT ?""", _copy_status_rows, batch_size)
+
+
+# --- 3: the pygame app's friends(user1, user2) / requests(sender, receiver) --- #
+def import_name_friends(store, batch_size):
+    conn = store.connection()
+    if {"user1", "user2"} <= _columns(conn, "friends"):
+        copy_in_batches(store, "friends_by_name", """
+            SELECT f.rowid, u.id, u.username, v.id, v.username
+            FROM friends f JOIN userdata u ON u.username = f.user1 JOIN userdata v ON v.username = f.user2
+            WHERE f.rowid > ? AND u.id != v.id ORDER BY f.rowid LIMIT ?""",
+            lambda c, rows: _add_friendship_rows(c, [row[1:] for row in rows]), batch_size)
+    if {"sender", "receiver"} <= _columns(conn, "requests"):
+        copy_in_batches(store, "requests_by_name", """
+            SELECT r.rowid, s.id, t.id
+            FROM requests r JOIN userdata s ON s.username = r.sender JOIN userdata t ON t.username = r.receiver
+            WHERE r.rowid > ? AND s.id != t.id ORDER BY r.rowid LIMIT ?""",
+            lambda c, rows: c.executemany("INSERT OR IGNORE INTO friend_requests(sender_id, receiver_id) VALUES(?,?)",
+                                          [row[1:] for row in rows]), batch_size)
+
+
+# --- 4 and 5: AccountV1's separate userdata.db --- #
+@contextmanager
+def _attached_v1(store):
+    # -> connection with userdata.db attached as "legacy", or None if absent
+    path = os.path.join(os.path.dirname(os.path.abspath(store.db_file)), LEGACY_USERS_DB)
+    if not os.path.exists(path) or os.path.abspath(path) == os.path.abspath(store.db_file):
+        yield None
+        return
+    conn = store.connection()
+    conn.execute("ATTACH DATABASE ? AS legacy", (path,))
+    try:
+        yield conn
+    finally:
+        conn.execute("DETACH DATABASE legacy")
+
+
+def import_v1_users(store, batch_size):
+    with _attached_v1(store) as conn:
+        if conn is None or not {"username", "password"} <= _columns(conn, "userdata", "legacy"):
+            return
+        # usernames already in appdata.db keep their current account
+        copy_in_batches(store, "accountv1_users", """
+            SELECT rowid, username, password FROM legacy.userdata
+            WHERE rowid > ? ORDER BY rowid LIMIT ?""",
+            lambda c, rows: c.executemany("INSERT OR IGNORE INTO userdata(username, password) VALUES(?,?)",
+                                          [row[1:] for row in rows]), batch_size)
+
+
+def import_v1_friends(store, batch_size):
+    # AccountV1 kept friends(user_id, friend_id, status) and, in older
+    # copies, friendships(sender_id, receiver_id, status), both keyed by
+    # userdata.db ids. Those ids map to the accounts migration 4 created
+    # via username (userdata.db allowed duplicate usernames; edges of a
+    # duplicate go to the account that was kept).
+    with _attached_v1(store) as conn:
+        if conn is None:
+            return
+        for table, a, b in (("friends", "user_id", "friend_id"), ("friendships", "sender_id", "receiver_id")):
+            if not {a, b, "status"} <= _columns(conn, table, "legacy"):
+                continue
+            copy_in_batches(store, f"accountv1_{table}", f"""
+                SELECT f.rowid, u.id, u.username, v.id, v.username, f.status
+                FROM legacy.{table} f
+                JOIN legacy.userdata lu ON lu.id = f.{a} JOIN userdata u ON u.username = lu.username
+                JOIN legacy.userdata lv ON lv.id = f.{b} JOIN userdata v ON v.username = lv.username
+                WHERE f.rowid > ? AND u.id != v.id ORDER BY f.rowid LIMIT ?""", _copy_status_rows, batch_size)
+
+
+MIGRATIONS = [
+    (1, "integer-keyed friendships and friend_requests", create_social_schema),
+    (2, "import AccountV2 friends", import_id_friends),
+    (3, "import pygame app friends and requests", import_name_friends),
+    (4, "import AccountV1 accounts", import_v1_users),
+    (5, "import AccountV1 friends and requests", import_v1_friends),
+]
+
+
+def migrate(store, migrations=MIGRATIONS, batch_size=BATCH_SIZE):
+    # -> versions applied by this call
+    applied = []
+    version = current_version(store)
+    for number, name, run in migrations:
+        if number <= version:
+            continue
+        run(store, batch_size)
+        with store.transaction() as conn:
+            conn.execute("INSERT INTO schema_version(version, name) VALUES(?,?)", (number, name))
+            # its batch positions are no longer needed once it is recorded
+            conn.execute("DELETE FROM migration_progress")
+        applied.append(number)
+    return applied
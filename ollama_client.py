@@ -0,0 +1,161 @@
+import json
+import socket
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# ------------------ Ollama Client ------------------ #
+# /api/generate streams newline-delimited JSON objects, one per chunk:
+#   {"model": "...", "response": "<token>", "done": false}
+#   ...
+#   {"model": "...", "response": "", "done": true, ...}
+# Each line is decoded with a real JSON parser (escaped quotes/newlines
+# inside tokens are handled) and tokens are yielded as they arrive.
+#
+# One OllamaClient is kept for the life of the app: its Session pools
+# keep-alive connections, so each question skips the TCP handshake, and
+# keep_alive asks Ollama to keep the model loaded between questions.
+#
+# stream(..., handle=StreamHandle()) lets another thread abort the call
+# with handle.abort(): the request's socket is shut down, which wakes the
+# streaming thread at once (even while Ollama is still loading the model
+# and hasn't sent headers yet) and tells Ollama to stop generating.
+
+OLLAMA_URL = "http://localhost:11434/api/generate"
+CONNECT_TIMEOUT = 3     # seconds to reach the server
+READ_TIMEOUT = 60       # max silence between streamed chunks
+KEEP_ALIVE = "30m"      # how long Ollama keeps the model in memory
+POOL_SIZE = 4
+
+
+class OllamaError(Exception):
+    pass
+
+
+class StreamHandle:
+    def __init__(self):
+        self.aborted = False
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _attach(self, conn):
+        with self._lock:
+            self._conn = conn
+            aborted = self.aborted
+        if aborted:
+            _shut_down(conn)
+
+    def _detach(self):
+        # the connection may go back to the pool; a late abort must not touch it
+        with self._lock:
+            self._conn = None
+
+    def abort(self):
+        with self._lock:
+            self.aborted = True
+            conn = self._conn
+        if conn is not None:
+            _shut_down(conn)
+
+
+def _shut_down(conn):
+    sock = getattr(conn, "sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+# The streaming thread's StreamHandle, seen by the connection that
+# carries its request (new or reused from the pool).
+_current = threading.local()
+
+
+class _AbortableConnection:
+    def connect(self):
+        super().connect()
+        handle = getattr(_current, "handle", None)
+        if handle is not None:
+            handle._attach(self)
+
+    def request(self, *args, **kwargs):
+        handle = getattr(_current, "handle", None)
+        if handle is not None:
+            handle._attach(self)
+        return super().request(*args, **kwargs)
+
+
+class _HTTPConnection(_AbortableConnection, HTTPConnection):
+    pass
+
+
+class _HTTPSConnection(_AbortableConnection, HTTPSConnection):
+    pass
+
+
+class _HTTPPool(HTTPConnectionPool):
+    ConnectionCls = _HTTPConnection
+
+
+class _HTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _HTTPSConnection
+
+
+class OllamaClient:
+    def __init__(self, url=OLLAMA_URL, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, keep_alive=KEEP_ALIVE, pool_size=POOL_SIZE):
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.keep_alive = keep_alive
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        adapter.poolmanager.pool_classes_by_scheme = {"http": _HTTPPool, "https": _HTTPSPool}
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def stream(self, prompt, model, handle=None):
+        payload = {"model": model, "prompt": prompt}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        _current.handle = handle
+        try:
+            response = self.session.post(self.url, json=payload,
+                                         timeout=self.timeout, stream=True)
+        except requests.RequestException as e:
+            raise OllamaError(f"Ollama error: {e}") from e
+        finally:
+            _current.handle = None
+        try:
+            yield from self._read(response)
+        finally:
+            if handle is not None:
+                handle._detach()
+
+    def _read(self, response):
+        with response:
+            if response.status_code != 200:
+                raise OllamaError(f"Error {response.status_code}: {response.text[:200]}")
+            try:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    try:
+                        data = json.loads(line)
+                    except ValueError:
+                        continue
+                    if data.get("error"):
+                        raise OllamaError(f"Ollama error: {data['error']}")
+                    token = data.get("response")
+                    if token:
+                        yield token
+                # The stream ends right after the "done" object. Reading it to
+                # the end (rather than breaking out) lets the connection go
+                # back to the pool instead of being closed.
+            except requests.RequestException as e:
+                raise OllamaError(f"Ollama error: {e}") from e
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,144 @@
+import os
+import hmac
+import queue
+import hashlib
+import threading
+
+# ------------------ Password Hashing ------------------ #
+# Passwords are stored as salted, deliberately slow KDF hashes:
+#     scrypt$<n>$<r>$<p>$<salt hex>$<hash hex>
+#     pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>
+# Every hash has its own random salt. The cost settings live in the
+# stored string, so they can be raised later without breaking existing
+# accounts: check_password() accepts any supported format (including the
+# old unsalted SHA-256 hex digests) and hands back a fresh hash whenever
+# the stored one is legacy or weaker than the current settings, for the
+# caller to save. Pick the costs with `python benchmarks.py password_kdf`.
+#
+# A hash takes tens of milliseconds on purpose, so UIs run login and
+# register through AuthWorker instead of calling these directly.
+
+SCHEME = "scrypt" if hasattr(hashlib, "scrypt") else "pbkdf2_sha256"
+SCRYPT_N = 1 << 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 200_000
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+
+def _scrypt(password, salt, n, r, p):
+    # maxmem: scrypt needs ~128*n*r bytes; OpenSSL's default cap is 32 MiB
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r + (1 << 20), dklen=KEY_BYTES)
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations, dklen=KEY_BYTES)
+
+
+def hash_password(password, scheme=SCHEME):
+    salt = os.urandom(SALT_BYTES)
+    if scheme == "scrypt":
+        key = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${key.hex()}"
+    if scheme == "pbkdf2_sha256":
+        key = _pbkdf2(password, salt, PBKDF2_ITERATIONS)
+        return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${salt.hex()}${key.hex()}"
+    raise ValueError(f"unknown password scheme {scheme!r}")
+
+
+def is_legacy(stored):
+    return "$" not in stored
+
+
+def verify_password(password, stored):
+    if not stored:
+        return False
+    if is_legacy(stored):
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(candidate, stored)
+    parts = stored.split("$")
+    try:
+        if parts[0] == "scrypt":
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            key = _scrypt(password, bytes.fromhex(parts[4]), n, r, p)
+            return hmac.compare_digest(key.hex(), parts[5])
+        if parts[0] == "pbkdf2_sha256":
+            key = _pbkdf2(password, bytes.fromhex(parts[2]), int(parts[1]))
+            return hmac.compare_digest(key.hex(), parts[3])
+    except (IndexError, ValueError):
+        return False
+    return False
+
+
+def needs_rehash(stored):
+    if is_legacy(stored):
+        return True
+    parts = stored.split("$")
+    if parts[0] != SCHEME:
+        return True
+    if SCHEME == "scrypt":
+        return (int(parts[1]), int(parts[2]), int(parts[3])) < (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return int(parts[1]) < PBKDF2_ITERATIONS
+
+
+def check_password(password, stored):
+    # -> (ok, new hash to store or None)
+    if not verify_password(password, stored):
+        return False, None
+    return True, hash_password(password) if needs_rehash(stored) else None
+
+
+# ------------------ Auth Worker ------------------ #
+# Runs login/register checks on a background thread so the window keeps
+# drawing while a hash is computed. Only the newest job counts: its
+# on_done(result) callback runs on the UI thread from poll(); results of
+# superseded jobs are dropped.
+
+class AuthWorker:
+    def __init__(self, wake=None):
+        self.wake = wake
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._latest = 0
+        self._finished = 0
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, on_done=None):
+        self._latest += 1
+        self._jobs.put((self._latest, fn, args, on_done))
+        return self._latest
+
+    def busy(self):
+        return self._finished != self._latest
+
+    def _loop(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            job_id, fn, args, on_done = job
+            try:
+                result = fn(*args)
+            except Exception as e:
+                print(f"Auth error: {e}")
+                result = None
+            self._results.put((job_id, on_done, result))
+            self._finished = job_id
+            if self.wake:
+                self.wake()
+
+    def poll(self):
+        while True:
+            try:
+                job_id, on_done, result = self._results.get_nowait()
+            except queue.Empty:
+                return
+            if job_id == self._latest and on_done:
+                on_done(result)
+
+    def stop(self):
+        self._jobs.put(None)
+        self._thread.join()
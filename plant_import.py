@@ -0,0 +1,147 @@
+import gzip
+import json
+import time
+import sqlite3
+
+# ------------------ Streaming plants.json Import ------------------ #
+# Imports a plants.json export into the plants table without loading the
+# whole file: the top-level array is decoded one object at a time from a
+# fixed-size read buffer, and rows go in with executemany, one
+# transaction per chunk. Memory stays flat however big the export is.
+
+READ_SIZE = 1 << 16
+CHUNK_SIZE = 1000
+NUMBER_END = " \t\r\n,]"   # what can follow a number inside the array
+
+INSERT_SQL = ("INSERT OR IGNORE INTO plants(name,age,shade,notes,photo,archived,source_json) "
+              "VALUES(?,?,?,?,?,?,1)")
+
+
+class ImportStats:
+    def __init__(self):
+        self.inserted = 0
+        self.skipped = 0    # already in the DB (UNIQUE(name, notes))
+        self.failed = 0     # not a plant object / rejected by SQLite
+        self.seconds = 0.0
+
+    @property
+    def total(self):
+        return self.inserted + self.skipped + self.failed
+
+    def rate(self):
+        return self.total / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.inserted} inserted, {self.skipped} skipped, {self.failed} failed "
+                f"in {self.seconds:.2f}s ({self.rate():.0f} records/s)")
+
+
+def iter_json_array(f, read_size=READ_SIZE):
+    # Yields the elements of a top-level JSON array from a text file object.
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        data = f.read(read_size)
+        if not data:
+            eof = True
+        buf = buf[pos:] + data
+        pos = 0
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    skip_ws()
+    if pos >= len(buf) or buf[pos] != "[":
+        raise ValueError("plants file is not a JSON array")
+    pos += 1
+    first = True
+    while True:
+        skip_ws()
+        if pos >= len(buf):
+            raise ValueError("unexpected end of plants file")
+        if buf[pos] == "]":
+            return
+        if not first:
+            if buf[pos] != ",":
+                raise ValueError(f"expected ',' in plants file near offset {pos}")
+            pos += 1
+            skip_ws()
+        first = False
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            # A number could have been cut off at the buffer edge: "12" may
+            # be the start of "123", and "1." or "1e" decode as 1 with the
+            # rest left over. A number is only complete once a delimiter
+            # follows it (or the file ends).
+            if (not eof and isinstance(item, (int, float)) and not isinstance(item, bool)
+                    and (end == len(buf) or buf[end] not in NUMBER_END)):
+                fill()
+                continue
+            break
+        pos = end
+        yield item
+
+
+def plant_row(p):
+    if not isinstance(p, dict):
+        raise TypeError("not a plant object")
+    return (p.get('name'), p.get('age'), 1 if p.get('shade') else 0,
+            p.get('notes'), p.get('photo'), 1 if p.get('archived') else 0)
+
+
+def _insert_chunk(store, rows, stats):
+    conn = store.connection()
+    try:
+        with store.transaction():
+            # rowcount sums the rows executemany inserted (not trigger changes)
+            inserted = conn.executemany(INSERT_SQL, rows).rowcount
+        stats.inserted += inserted
+        stats.skipped += len(rows) - inserted
+    except (sqlite3.Error, ValueError):
+        # one bad row spoils executemany; redo this chunk row by row to find it
+        with store.transaction():
+            for row in rows:
+                try:
+                    cur = conn.execute(INSERT_SQL, row)
+                except (sqlite3.Error, ValueError):
+                    stats.failed += 1
+                    continue
+                if cur.rowcount:
+                    stats.inserted += 1
+                else:
+                    stats.skipped += 1
+
+
+def import_plants(store, path, chunk_size=CHUNK_SIZE):
+    stats = ImportStats()
+    start = time.perf_counter()
+    opener = gzip.open if path.endswith(".gz") else open
+    rows = []
+    with opener(path, "rt", encoding="utf-8") as f:
+        for item in iter_json_array(f):
+            try:
+                rows.append(plant_row(item))
+            except TypeError:
+                stats.failed += 1
+                continue
+            if len(rows) >= chunk_size:
+                _insert_chunk(store, rows, stats)
+                rows = []
+    if rows:
+        _insert_chunk(store, rows, stats)
+    stats.seconds = time.perf_counter() - start
+    return stats
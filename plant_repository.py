@@ -0,0 +1,163 @@
+import heapq
+from bisect import bisect_left
+
+# ------------------ Plant Repository ------------------ #
+# Owns the plants table and an in-memory copy of it. The copy is loaded
+# once; after that every add/update/delete writes one row and patches
+# the in-memory lists in place, instead of re-reading the whole table
+# after each edit.
+#
+# Plants are split into two partitions, active and archived, each kept
+# in ascending id order (new ids are always the largest, so adding is
+# an append) with a parallel id list for bisect lookups. Archiving moves
+# a plant from one partition to the other. view(archived) hands the UI a
+# newest-first sequence over one partition without copying it, so
+# switching between the plant list and the archive costs nothing.
+
+COLUMNS = ("name", "age", "shade", "notes", "photo", "archived")
+
+
+def row_to_plant(r):
+    return {'id': r[0], 'name': r[1] or "", 'age': r[2] or "", 'shade': bool(r[3]),
+            'notes': r[4] or "", 'photo': r[5], 'archived': bool(r[6])}
+
+
+def plant_params(plant):
+    return (plant.get('name'), plant.get('age'), 1 if plant.get('shade') else 0,
+            plant.get('notes'), plant.get('photo'), 1 if plant.get('archived') else 0)
+
+
+class _Partition:
+    def __init__(self, plants=()):
+        self.plants = list(plants)
+        self.ids = [p['id'] for p in self.plants]
+
+    def add(self, plant):
+        if self.ids and plant['id'] < self.ids[-1]:
+            pos = bisect_left(self.ids, plant['id'])
+            self.ids.insert(pos, plant['id']); self.plants.insert(pos, plant)
+        else:
+            self.ids.append(plant['id']); self.plants.append(plant)
+
+    def remove(self, plant_id):
+        pos = bisect_left(self.ids, plant_id)
+        if pos < len(self.ids) and self.ids[pos] == plant_id:
+            del self.ids[pos]; del self.plants[pos]
+
+
+class PlantView:
+    # Read-only, newest-first window onto one partition. It follows later
+    # edits to that partition, so it never needs rebuilding.
+    def __init__(self, partition):
+        self._plants = partition.plants
+
+    def __len__(self):
+        return len(self._plants)
+
+    def __getitem__(self, i):
+        n = len(self._plants)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        return self._plants[n - 1 - i]
+
+    def __iter__(self):
+        return reversed(self._plants)
+
+
+class PlantRepository:
+    def __init__(self, store):
+        self.store = store
+        self._active = _Partition()
+        self._archived = _Partition()
+        self._by_id = {}
+        self.version = 0    # bumped on every change, for redraw checks
+
+    def setup(self):
+        self.store.execute("""CREATE TABLE IF NOT EXISTS plants(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            age TEXT,
+            shade INTEGER,
+            notes TEXT,
+            photo TEXT,
+            archived INTEGER DEFAULT 0,
+            source_json INTEGER DEFAULT 0,
+            UNIQUE(name, notes) -- naive uniqueness to avoid duplicates from import
+        )""")
+        # each partition loads as one ordered index range, no sort step
+        self.store.execute("CREATE INDEX IF NOT EXISTS idx_plants_archived_id ON plants(archived, id)")
+
+    def _load_partition(self, archived):
+        rows = self.store.fetchall("SELECT id,name,age,shade,notes,photo,archived FROM plants "
+                                   "WHERE archived=? ORDER BY id", (archived,))
+        return _Partition(row_to_plant(r) for r in rows)
+
+    def load(self):
+        self._active = self._load_partition(0)
+        self._archived = self._load_partition(1)
+        self._by_id = {p['id']: p for p in self._active.plants}
+        self._by_id.update((p['id'], p) for p in self._archived.plants)
+        self.version += 1
+
+    def _partition(self, archived):
+        return self._archived if archived else self._active
+
+    # --- reads --- #
+    def __len__(self):
+        return len(self._by_id)
+
+    def count(self, archived):
+        return len(self._partition(archived).plants)
+
+    def get(self, plant_id):
+        return self._by_id.get(plant_id)
+
+    def view(self, archived):
+        return PlantView(self._partition(archived))
+
+    def newest_first(self):
+        return heapq.merge(reversed(self._active.plants), reversed(self._archived.plants),
+                           key=lambda p: p['id'], reverse=True)
+
+    def snapshot(self):
+        # plain copies, newest first (same order plants.json always had)
+        return [dict(p) for p in self.newest_first()]
+
+    def export_rows(self):
+        # Same shape as snapshot() but read straight from the DB, so it is
+        # safe to call from a background thread (own connection per thread).
+        rows = self.store.fetchall("SELECT id,name,age,shade,notes,photo,archived FROM plants ORDER BY id DESC")
+        return [row_to_plant(r) for r in rows]
+
+    # --- single-row writes --- #
+    def add(self, plant):
+        cur = self.store.execute("INSERT INTO plants(name,age,shade,notes,photo,archived,source_json) VALUES(?,?,?,?,?,?,0)",
+                                 plant_params(plant))
+        new = row_to_plant((cur.lastrowid,) + plant_params(plant))
+        self._partition(new['archived']).add(new)
+        self._by_id[new['id']] = new
+        self.version += 1
+        return new
+
+    def update(self, plant_id, plant):
+        self.store.execute("UPDATE plants SET name=?,age=?,shade=?,notes=?,photo=?,archived=?,source_json=0 WHERE id=?",
+                           plant_params(plant) + (plant_id,))
+        current = self._by_id.get(plant_id)
+        if current is not None:
+            was_archived = current['archived']
+            # patch the cached dict in place so references held by the UI stay valid
+            current.update(row_to_plant((plant_id,) + plant_params(plant)))
+            if current['archived'] != was_archived:
+                self._partition(was_archived).remove(plant_id)
+                self._partition(current['archived']).add(current)
+            self.version += 1
+        return current
+
+    def delete(self, plant_id):
+        self.store.execute("DELETE FROM plants WHERE id=?", (plant_id,))
+        plant = self._by_id.pop(plant_id, None)
+        if plant is not None:
+            self._partition(plant['archived']).remove(plant_id)
+            self.version += 1
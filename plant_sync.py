@@ -0,0 +1,102 @@
+import os
+import hashlib
+
+# ------------------ plants.json <-> DB Sync Checkpoint ------------------ #
+# Remembers what plants.json looked like (size, mtime, content hash) the
+# last time it was imported or written, and which version of the plants
+# table was last exported. Triggers on the plants table bump a change
+# counter on every insert/update/delete. At startup:
+#   - the file is only imported if it changed since we last saw it
+#     (size/mtime first; the hash is only computed when those differ),
+#   - the table is only re-exported if it changed since the last export.
+
+HASH_BLOCK = 1 << 20
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class PlantSync:
+    def __init__(self, store, json_path):
+        self.store = store
+        self.json_path = json_path
+        self._pending_version = None
+
+    def setup(self):
+        with self.store.transaction() as cur:
+            cur.execute("""CREATE TABLE IF NOT EXISTS sync_state(
+                name TEXT PRIMARY KEY,
+                file_size INTEGER,
+                file_mtime INTEGER,
+                file_hash TEXT,
+                db_version INTEGER NOT NULL DEFAULT 0,
+                exported_version INTEGER
+            )""")
+            cur.execute("INSERT OR IGNORE INTO sync_state(name, db_version) VALUES('plants', 0)")
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                cur.execute(f"""CREATE TRIGGER IF NOT EXISTS plants_changed_{event.lower()}
+                    AFTER {event} ON plants
+                    BEGIN
+                        UPDATE sync_state SET db_version = db_version + 1 WHERE name = 'plants';
+                    END""")
+
+    def _state(self):
+        return self.store.fetchone("SELECT file_size, file_mtime, file_hash, db_version, exported_version "
+                                   "FROM sync_state WHERE name='plants'")
+
+    def db_version(self):
+        return self._state()[3]
+
+    def _stat(self):
+        try:
+            st = os.stat(self.json_path)
+        except FileNotFoundError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def file_changed(self):
+        stat = self._stat()
+        if stat is None:
+            return False
+        size, mtime, digest, _, _ = self._state()
+        if (size, mtime) == stat:
+            return False
+        # touched, but maybe not edited: compare contents before re-importing
+        if digest is not None and size == stat[0] and file_hash(self.json_path) == digest:
+            self._remember_file()
+            return False
+        return True
+
+    def needs_export(self):
+        _, _, _, version, exported = self._state()
+        return self._stat() is None or exported != version
+
+    def _remember_file(self, version=None):
+        stat = self._stat()
+        if stat is None:
+            return
+        digest = file_hash(self.json_path)
+        if version is None:
+            self.store.execute("UPDATE sync_state SET file_size=?, file_mtime=?, file_hash=? WHERE name='plants'",
+                               stat + (digest,))
+        else:
+            self.store.execute("UPDATE sync_state SET file_size=?, file_mtime=?, file_hash=?, exported_version=? "
+                               "WHERE name='plants'", stat + (digest, version))
+
+    def record_import(self):
+        # plants.json has been imported; don't import this version again
+        self._remember_file()
+
+    # --- used by the snapshot writer (runs on its thread) --- #
+    def export_rows(self, load_rows):
+        with self.store.transaction(immediate=False):
+            self._pending_version = self.db_version()
+            return load_rows()
+
+    def record_export(self):
+        self._remember_file(self._pending_version)
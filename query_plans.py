@@ -0,0 +1,193 @@
+import os
+import re
+import sys
+import json
+import tempfile
+
+from datastore import DataStore
+from social import SocialRepository
+from plant_repository import PlantRepository
+from plant_sync import PlantSync
+from plant_import import import_plants
+from answer_cache import AnswerCache
+
+# ------------------ Query Plan Check ------------------ #
+# Run with:  python query_plans.py [-v]   (exit status 1 on a regression)
+# Builds a populated fixture database in a temp directory, drives every
+# data-layer module through its normal calls while a trace callback
+# records each SQL statement they issue, then runs EXPLAIN QUERY PLAN on
+# every distinct statement. A plan that scans a table or index or sorts
+# through a temp B-tree fails the check, unless the statement is listed
+# in ALLOWED_SCANS with the reason the scan is intended.
+# The fixture is not ANALYZEd: the app never runs ANALYZE, so the
+# planner sees the same (no statistics) picture it does in appdata.db.
+
+USERS = 2000
+FRIENDS_PER_USER = 20
+PLANTS = 5000
+ANSWERS = 300
+
+# statements whose scan is intended, by prefix -> why
+ALLOWED_SCANS = {
+    "SELECT id,name,age,shade,notes,photo,archived FROM plants ORDER BY id DESC":
+        "plants.json export writes out every plant",
+    "SELECT COUNT(*) FROM ai_answers":
+        "the answer cache holds at most max_entries rows",
+    "DELETE FROM ai_answers WHERE created <":
+        "expired answers are purged once at startup",
+    "DELETE FROM ai_answers WHERE key IN ( SELECT key FROM ai_answers ORDER BY last_used LIMIT":
+        "walks idx_ai_answers_last_used oldest first and stops at the LIMIT",
+}
+
+SKIP = ("BEGIN", "COMMIT", "ROLLBACK", "PRAGMA", "CREATE", "DROP", "ATTACH", "DETACH", "--")
+
+
+# --- fixture --- #
+def seed_legacy_friends(path):
+    # AccountV2's old tables; migrate() moves them into the current schema
+    store = DataStore(path)
+    with store.transaction() as conn:
+        conn.execute("CREATE TABLE userdata(id INTEGER PRIMARY KEY, username TEXT UNIQUE NOT NULL, password TEXT NOT NULL)")
+        conn.execute("CREATE TABLE friends(id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+                      "friend_id INTEGER NOT NULL, status TEXT NOT NULL)")
+        conn.executemany("INSERT INTO userdata(id, username, password) VALUES(?,?,?)",
+                         ((i, f"user{i}", "x") for i in range(1, USERS + 1)))
+        conn.executemany("INSERT INTO friends(user_id, friend_id, status) VALUES(?,?,?)",
+                         ((i, (i + k * 37) % USERS + 1, "accepted" if k else "pending")
+                          for i in range(1, USERS + 1) for k in range(FRIENDS_PER_USER // 2)))
+    store.close()
+
+
+def write_plants_json(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([{"name": f"Plant {i}", "age": "1", "shade": i % 2, "notes": f"n{i}",
+                    "photo": "", "archived": i % 5 == 0} for i in range(PLANTS)], f)
+
+
+def exercise(store, tmp):
+    # the calls the apps make, with the arguments they would pass
+    social = SocialRepository(store)
+    social.setup()
+    for user in ("user1", "user500", "user1999"):
+        social.user_id(user)
+        social.user_exists(user)
+        social.password_hash(user)
+        social.replace_password_hash(user, "x", "x")
+        social.friends(user)
+        social.friends_page(user, None, 5)
+        social.friends_page(user, "user5", 5)
+        social.count_friends(user)
+        social.incoming_requests(user)
+        social.outgoing_requests(user)
+        social.request_counts(user)
+    social.create_user("newbie", "x")
+    social.are_friends("user1", "user2")
+    social.has_request("user1", "user2")
+    social.send_request("newbie", "user1")
+    social.accept_request("newbie", "user1")
+    social.remove_friendship("newbie", "user1")
+    social.send_request("newbie", "user2")
+    social.decline_request("newbie", "user2")
+    social.send_request("newbie", "user3")
+    social.cancel_request("newbie", "user3")
+    social.add_friendship("newbie", "user4")
+    social.send_requests("newbie", ["user5", "user6", "user7", "user8"])
+    social.cancel_requests("newbie", ["user5"])
+    social.accept_requests("user6", ["newbie"])
+    social.decline_requests("user7", ["newbie"])
+
+    plants_json = os.path.join(tmp, "plants.json")
+    write_plants_json(plants_json)
+    repo = PlantRepository(store)
+    sync = PlantSync(store, plants_json)
+    with store.transaction():
+        repo.setup()
+        sync.setup()
+    sync.file_changed()
+    import_plants(store, plants_json)
+    sync.record_import()
+    repo.load()
+    plant = repo.add({"name": "Basil", "age": "1", "shade": False, "notes": "", "photo": "", "archived": False})
+    repo.update(plant["id"], dict(plant, archived=True))
+    repo.delete(plant["id"])
+    sync.needs_export()
+    sync.export_rows(repo.export_rows)
+    sync.record_export()
+
+    cache = AnswerCache(store, max_entries=ANSWERS // 2)
+    for i in range(ANSWERS):
+        cache.put(f"question {i}", "model", "answer")
+    cache.get("question 299", "model")
+    cache.get("question 0", "model")
+    cache.purge_expired()
+    cache.stats()
+
+
+# --- plan check --- #
+def shape(sql):
+    # statement with its literal values blanked out, to group repeats
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+(?:\.\d+)?\b", "?", sql)
+    return " ".join(sql.split())
+
+
+def bad_steps(plan):
+    return [detail for _, _, _, detail in plan
+            if (detail.startswith("SCAN ") and detail != "SCAN CONSTANT ROW") or "TEMP B-TREE" in detail]
+
+
+def allowed_reason(sql):
+    flat = " ".join(sql.split())
+    for prefix, reason in ALLOWED_SCANS.items():
+        if flat.startswith(prefix):
+            return reason
+    return None
+
+
+def collect_statements(store, tmp):
+    statements = {}
+
+    def trace(sql):
+        if not sql.lstrip().upper().startswith(SKIP):
+            statements.setdefault(shape(sql), sql)
+
+    store.connection().set_trace_callback(trace)
+    try:
+        exercise(store, tmp)
+    finally:
+        store.connection().set_trace_callback(None)
+    return statements
+
+
+def check(verbose=False):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "fixture.db")
+        seed_legacy_friends(path)
+        store = DataStore(path)
+        try:
+            statements = collect_statements(store, tmp)
+            failures = allowed = 0
+            for key, sql in sorted(statements.items()):
+                plan = store.fetchall("EXPLAIN QUERY PLAN " + sql)
+                bad = bad_steps(plan)
+                reason = allowed_reason(sql) if bad else None
+                if bad and reason is None:
+                    failures += 1
+                    print(f"FAIL  {key}")
+                elif bad:
+                    allowed += 1
+                    if verbose:
+                        print(f"scan  {key}\n      ({reason})")
+                elif verbose:
+                    print(f"ok    {key}")
+                if verbose or (bad and reason is None):
+                    for _, _, _, detail in plan:
+                        print(f"        {detail}")
+        finally:
+            store.close()
+    print(f"{len(statements)} statements checked, {allowed} allowed scans, {failures} failed")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if check("-v" in sys.argv[1:]) else 0)
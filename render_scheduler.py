@@ -0,0 +1,95 @@
+import pygame
+
+# ------------------ Render Scheduler ------------------ #
+# Frame pacing + dirty rectangles for the pygame loops.
+#
+#  - events() blocks on pygame.event.wait while nothing is animating, so an
+#    idle window costs (almost) no CPU; otherwise it polls.
+#  - Widgets call track(key, rect, signature) while drawing. present()
+#    compares against the previous frame and only pushes the rects whose
+#    signature changed (or that appeared/disappeared) via display.update.
+#  - present() caps the frame rate with pygame.time.Clock.
+#
+# Background threads call wake() to get a frame drawn (e.g. an AI answer
+# arrived); it posts an event, which is safe from any thread.
+
+REDRAW_EVENT = pygame.USEREVENT + 1
+DEFAULT_FPS = 60
+IDLE_TIMEOUT_MS = 500   # still wake up now and then (timers like warnings)
+
+
+class RenderScheduler:
+    def __init__(self, fps=DEFAULT_FPS, idle_timeout=IDLE_TIMEOUT_MS):
+        self.fps = fps
+        self.idle_timeout = idle_timeout
+        self.clock = pygame.time.Clock()
+        self._animations = set()
+        self._frames_wanted = 1
+        self._full = True
+        self._prev = {}
+        self._cur = {}
+        self.frames = 0
+        self.pushed_area = 0
+
+    # --- scheduling --- #
+    def start_animation(self, key):
+        self._animations.add(key)
+
+    def stop_animation(self, key):
+        self._animations.discard(key)
+
+    def request_frame(self):
+        self._frames_wanted = max(self._frames_wanted, 1)
+
+    def invalidate(self):
+        # Next present() pushes the whole screen (screen switch, modal closed...)
+        self._full = True
+        self.request_frame()
+
+    def wake(self):
+        pygame.event.post(pygame.event.Event(REDRAW_EVENT))
+
+    def idle(self):
+        return not self._animations and self._frames_wanted <= 0
+
+    def events(self):
+        if self.idle():
+            first = pygame.event.wait(self.idle_timeout)
+            events = [] if first.type == pygame.NOEVENT else [first]
+            events += pygame.event.get()
+        else:
+            events = pygame.event.get()
+        if events:
+            # Handling these may change state after this frame was drawn, so
+            # keep the next two frames unblocked to get the result on screen.
+            self._frames_wanted = 2
+        return events
+
+    # --- dirty tracking --- #
+    def track(self, key, rect, signature=None):
+        self._cur[key] = (pygame.Rect(rect), signature)
+
+    def present(self):
+        if self._full:
+            pygame.display.flip()
+            w, h = pygame.display.get_surface().get_size()
+            self.pushed_area = w * h
+        else:
+            dirty = []
+            for key, (rect, sig) in self._cur.items():
+                old = self._prev.get(key)
+                if old is None or old[1] != sig or old[0] != rect:
+                    dirty.append(rect)
+                    if old is not None and old[0] != rect:
+                        dirty.append(old[0])
+            for key, (rect, _) in self._prev.items():
+                if key not in self._cur:
+                    dirty.append(rect)
+            if dirty:
+                pygame.display.update(dirty)
+            self.pushed_area = sum(r.w * r.h for r in dirty)
+        self._prev, self._cur = self._cur, {}
+        self._full = False
+        self._frames_wanted -= 1
+        self.frames += 1
+        self.clock.tick(self.fps)
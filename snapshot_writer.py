@@ -0,0 +1,109 @@
+import os
+import gzip
+import json
+import time
+import threading
+
+# ------------------ Plants Snapshot Writer ------------------ #
+# Writes plants.json in the background instead of on the UI thread.
+#  - mark_dirty() just records that a write is needed; bursts of edits
+#    within `delay` seconds collapse into one write.
+#  - The snapshot is produced by `load()` on the writer thread (the plant
+#    repository reads it from its own DB connection), so the UI's data is
+#    never touched from here.
+#  - Files are written to a temp file, fsynced and renamed over the old
+#    one, so a crash leaves either the old or the new snapshot, never a
+#    half-written file.
+#  - compact=True drops the indent; a ".gz" path is gzip-compressed.
+#  - on_written() (optional) runs on the writer thread after each write.
+
+DEFAULT_DELAY = 0.5
+
+
+def encode_snapshot(data, compact=True):
+    if compact:
+        return json.dumps(data, separators=(",", ":")).encode()
+    return json.dumps(data, indent=2).encode()
+
+
+def read_snapshot(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        return json.loads(f.read())
+
+
+def write_atomic(path, payload):
+    tmp = f"{path}.tmp"
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(tmp, "wb") as f:
+        f.write(payload)
+    # gzip.open closes its file object, so fsync through a fresh handle
+    with open(tmp, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class SnapshotWriter:
+    def __init__(self, path, load, delay=DEFAULT_DELAY, compact=True, on_written=None):
+        self.path = path
+        self.load = load
+        self.on_written = on_written
+        self.delay = delay
+        self.compact = compact
+        self.writes = 0
+        self.last_error = None
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._dirty_at = None
+        self._stopped = False
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self):
+        with self._cond:
+            self._dirty_at = time.monotonic()
+            self._cond.notify()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._dirty_at is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                # wait until edits have been quiet for `delay` seconds
+                while not self._stopped:
+                    remaining = self._dirty_at + self.delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._stopped:
+                    return
+                self._dirty_at = None
+            self._write()
+
+    def _write(self):
+        with self._write_lock:
+            try:
+                write_atomic(self.path, encode_snapshot(self.load(), self.compact))
+                self.writes += 1
+                self.last_error = None
+                if self.on_written:
+                    self.on_written()
+            except Exception as e:
+                self.last_error = e
+                print(f"Could not write {self.path}: {e}")
+
+    def flush(self):
+        # write now (on the caller's thread) if anything is pending
+        with self._cond:
+            pending, self._dirty_at = self._dirty_at is not None, None
+        if pending:
+            self._write()
+
+    def close(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
@@ -0,0 +1,195 @@
+import sqlite3
+
+from migrations import migrate
+
+# ------------------ Accounts, Friends and Requests ------------------ #
+# The one data layer for accounts and the friends system, shared by the
+# pygame app and the AccountV2 CLI (both used to carry their own tables
+# and queries). Callers work with usernames; underneath everything is
+# keyed by integer user id (schema in migrations.py):
+#   friendships(user_id, friend_id, friend_name)  one row per direction
+#   friend_requests(id, sender_id, receiver_id)   indexed both ways
+# Each lookup is a single index range: "friends of X" reads X's rows
+# only, and a page of friends comes straight off the (user_id,
+# friend_name) index in name order.
+
+USER_ID = "(SELECT id FROM userdata WHERE username = ?)"
+
+
+class SocialRepository:
+    def __init__(self, store):
+        self.store = store
+
+    def setup(self):
+        # creates/upgrades the schema; call outside any open transaction
+        return migrate(self.store)
+
+    # --- accounts --- #
+    def user_id(self, username):
+        row = self.store.fetchone("SELECT id FROM userdata WHERE username = ?", (username,))
+        return row[0] if row else None
+
+    def user_exists(self, username):
+        return self.user_id(username) is not None
+
+    def create_user(self, username, password_hash):
+        try:
+            self.store.execute("INSERT INTO userdata(username, password) VALUES(?,?)", (username, password_hash))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def password_hash(self, username):
+        row = self.store.fetchone("SELECT password FROM userdata WHERE username = ?", (username,))
+        return row[0] if row else None
+
+    def replace_password_hash(self, username, old_hash, new_hash):
+        # only if unchanged since it was read (e.g. two logins at once)
+        self.store.execute("UPDATE userdata SET password = ? WHERE username = ? AND password = ?",
+                           (new_hash, username, old_hash))
+
+    # --- friendships --- #
+    def friends(self, username):
+        return self.store.column(f"SELECT friend_name FROM friendships WHERE user_id = {USER_ID} "
+                                 "ORDER BY friend_name", (username,))
+
+    def friends_page(self, username, after, limit):
+        # next `limit` friends by name after `after` (None: from the start)
+        return self.store.column(f"SELECT friend_name FROM friendships WHERE user_id = {USER_ID} "
+                                 "AND friend_name > ? ORDER BY friend_name LIMIT ?",
+                                 (username, "" if after is None else after, limit))
+
+    def count_friends(self, username):
+        return self.store.fetchone(f"SELECT COUNT(*) FROM friendships WHERE user_id = {USER_ID}", (username,))[0]
+
+    def are_friends(self, a, b):
+        return self.store.fetchone(f"SELECT 1 FROM friendships WHERE user_id = {USER_ID} AND friend_id = {USER_ID}",
+                                   (a, b)) is not None
+
+    def add_friendship(self, a, b):
+        if a == b:
+            return False
+        with self.store.transaction() as conn:
+            ids = conn.execute("SELECT u.id, v.id FROM userdata u, userdata v WHERE u.username = ? AND v.username = ?",
+                               (a, b)).fetchone()
+            if ids is None:
+                return False
+            a_id, b_id = ids
+            added = conn.execute("INSERT OR IGNORE INTO friendships(user_id, friend_id, friend_name) VALUES(?,?,?)",
+                                 (a_id, b_id, b)).rowcount
+            conn.execute("INSERT OR IGNORE INTO friendships(user_id, friend_id, friend_name) VALUES(?,?,?)",
+                         (b_id, a_id, a))
+        return added > 0
+
+    def remove_friendship(self, a, b):
+        with self.store.transaction() as conn:
+            removed = conn.execute(f"DELETE FROM friendships WHERE user_id = {USER_ID} AND friend_id = {USER_ID}",
+                                   (a, b)).rowcount
+            conn.execute(f"DELETE FROM friendships WHERE user_id = {USER_ID} AND friend_id = {USER_ID}", (b, a))
+        return removed > 0
+
+    # --- requests --- #
+    def send_request(self, sender, receiver):
+        if sender == receiver:
+            return False
+        try:
+            cur = self.store.execute("INSERT INTO friend_requests(sender_id, receiver_id) "
+                                     "SELECT s.id, r.id FROM userdata s, userdata r "
+                                     "WHERE s.username = ? AND r.username = ?", (sender, receiver))
+        except sqlite3.IntegrityError:
+            return False
+        return cur.rowcount > 0
+
+    def _delete_request(self, sender, receiver):
+        return self.store.execute(f"DELETE FROM friend_requests WHERE sender_id = {USER_ID} "
+                                  f"AND receiver_id = {USER_ID}", (sender, receiver)).rowcount > 0
+
+    def accept_request(self, sender, receiver):
+        with self.store.transaction():
+            if not self._delete_request(sender, receiver):
+                return False
+            self.add_friendship(sender, receiver)
+        return True
+
+    def decline_request(self, sender, receiver):
+        return self._delete_request(sender, receiver)
+
+    def cancel_request(self, sender, receiver):
+        return self._delete_request(sender, receiver)
+
+    # --- bulk request actions: one transaction, one executemany each --- #
+    def _pending_with(self, conn, username, others, incoming):
+        # -> (user id, [(id, name)]) for username's pending requests from
+        # (incoming) or to others, in the order given
+        mine, theirs = ("receiver_id", "sender_id") if incoming else ("sender_id", "receiver_id")
+        row = conn.execute("SELECT id FROM userdata WHERE username = ?", (username,)).fetchone()
+        if row is None:
+            return None, []
+        pending = dict((name, uid) for uid, name in conn.execute(
+            f"SELECT u.id, u.username FROM friend_requests r JOIN userdata u ON u.id = r.{theirs} "
+            f"WHERE r.{mine} = ?", (row[0],)))
+        return row[0], [(pending[name], name) for name in dict.fromkeys(others) if name in pending]
+
+    def accept_requests(self, receiver, senders):
+        # -> the senders whose requests were accepted
+        with self.store.transaction() as conn:
+            receiver_id, found = self._pending_with(conn, receiver, senders, incoming=True)
+            conn.executemany("DELETE FROM friend_requests WHERE sender_id = ? AND receiver_id = ?",
+                             [(sender_id, receiver_id) for sender_id, _ in found])
+            conn.executemany("INSERT OR IGNORE INTO friendships(user_id, friend_id, friend_name) VALUES(?,?,?)",
+                             [(sender_id, receiver_id, receiver) for sender_id, _ in found] +
+                             [(receiver_id, sender_id, name) for sender_id, name in found])
+        return [name for _, name in found]
+
+    def decline_requests(self, receiver, senders):
+        with self.store.transaction() as conn:
+            receiver_id, found = self._pending_with(conn, receiver, senders, incoming=True)
+            conn.executemany("DELETE FROM friend_requests WHERE sender_id = ? AND receiver_id = ?",
+                             [(sender_id, receiver_id) for sender_id, _ in found])
+        return [name for _, name in found]
+
+    def cancel_requests(self, sender, receivers):
+        with self.store.transaction() as conn:
+            sender_id, found = self._pending_with(conn, sender, receivers, incoming=False)
+            conn.executemany("DELETE FROM friend_requests WHERE sender_id = ? AND receiver_id = ?",
+                             [(sender_id, receiver_id) for receiver_id, _ in found])
+        return [name for _, name in found]
+
+    def send_requests(self, sender, receivers):
+        # -> the receivers a request went to; skips unknown users, friends
+        # and anyone a request is already pending with (either way round)
+        receivers = [r for r in dict.fromkeys(receivers) if r != sender]
+        with self.store.transaction() as conn:
+            sender_id, before = self._pending_with(conn, sender, receivers, incoming=False)
+            if sender_id is None:
+                return []
+            conn.executemany("""INSERT OR IGNORE INTO friend_requests(sender_id, receiver_id)
+                SELECT ?, u.id FROM userdata u WHERE u.username = ?
+                AND NOT EXISTS (SELECT 1 FROM friendships WHERE user_id = ? AND friend_id = u.id)
+                AND NOT EXISTS (SELECT 1 FROM friend_requests WHERE sender_id = u.id AND receiver_id = ?)""",
+                             [(sender_id, r, sender_id, sender_id) for r in receivers])
+            _, after = self._pending_with(conn, sender, receivers, incoming=False)
+        already = {name for _, name in before}
+        return [name for _, name in after if name not in already]
+
+    def incoming_requests(self, username):
+        # senders, oldest request first
+        return self.store.column(f"SELECT u.username FROM friend_requests r JOIN userdata u ON u.id = r.sender_id "
+                                 f"WHERE r.receiver_id = {USER_ID} ORDER BY r.id", (username,))
+
+    def outgoing_requests(self, username):
+        return self.store.column(f"SELECT u.username FROM friend_requests r JOIN userdata u ON u.id = r.receiver_id "
+                                 f"WHERE r.sender_id = {USER_ID}", (username,))
+
+    def request_counts(self, username):
+        # -> (incoming, outgoing): one statement, each count an index range
+        row = self.store.fetchone("SELECT (SELECT COUNT(*) FROM friend_requests WHERE receiver_id = u.id), "
+                                  "(SELECT COUNT(*) FROM friend_requests WHERE sender_id = u.id) "
+                                  "FROM userdata u WHERE u.username = ?", (username,))
+        return row if row else (0, 0)
+
+    def has_request(self, a, b):
+        # a pending request between a and b, either way round
+        return self.store.fetchone(f"SELECT 1 FROM friend_requests WHERE sender_id = {USER_ID} AND receiver_id = {USER_ID} "
+                                   f"UNION ALL SELECT 1 FROM friend_requests WHERE sender_id = {USER_ID} "
+                                   f"AND receiver_id = {USER_ID}", (a, b, b, a)) is not None
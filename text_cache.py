@@ -0,0 +1,54 @@
+from collections import OrderedDict
+
+# ------------------ Text Surface Cache ------------------ #
+# font.render() is the most expensive call in the draw loop, and almost
+# every label is the same from one frame to the next. Rendered surfaces
+# are kept in a bounded LRU keyed by (font, text, antialias, colour).
+# Callers must treat returned surfaces as read-only (blit them, don't
+# draw on them).
+
+MAX_ENTRIES = 512
+
+
+class TextCache:
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, antialias, color):
+        # pygame.Color isn't hashable, so normalise colours to tuples
+        key = (font, text, antialias, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {"entries": len(self._surfaces), "max_entries": self.max_entries,
+                "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": self.hit_rate()}
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = 0
+
+    def clear(self):
+        self._surfaces.clear()
+
+
+text_cache = TextCache()
+render_text = text_cache.render
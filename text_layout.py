@@ -0,0 +1,103 @@
+import re
+
+# ------------------ Wrapped Text Layout ------------------ #
+# Word-wraps a block of text once per change instead of re-measuring it
+# every frame. Widths come from a per-font glyph advance cache, so no
+# surfaces are rendered just to measure. When the new text only extends
+# the old one (streamed answers), wrapping restarts at the last line
+# instead of the top. Line surfaces are rendered on first draw and kept
+# until their line changes. scroll_y (<= 0) offsets the lines inside the
+# box for long answers.
+
+_WORD = re.compile(r"\S+")
+_advances = {}
+
+
+def glyph_advance(font, ch):
+    cache = _advances.setdefault(font, {})
+    adv = cache.get(ch)
+    if adv is None:
+        m = font.metrics(ch)
+        adv = m[0][4] if m and m[0] else font.size(ch)[0]
+        cache[ch] = adv
+    return adv
+
+
+def text_width(font, text):
+    return sum(glyph_advance(font, ch) for ch in text)
+
+
+class TextLayout:
+    def __init__(self, font, width, line_height=20, color=(0, 0, 0)):
+        self.font = font
+        self.width = width
+        self.line_height = line_height
+        self.color = color
+        self.text = ""
+        self.scroll_y = 0
+        self._lines = []      # (start index in text, line string)
+        self._surfaces = []   # rendered line, or None until drawn
+
+    def set_text(self, text):
+        if text == self.text:
+            return
+        if self._lines and self.text and text.startswith(self.text):
+            start = self._lines.pop()[0]
+            self._surfaces.pop()
+        else:
+            start = 0
+            self._lines, self._surfaces = [], []
+            self.scroll_y = 0
+        self.text = text
+        self._wrap_from(start)
+
+    def set_width(self, width):
+        if width != self.width:
+            self.width = width
+            self._lines, self._surfaces = [], []
+            self._wrap_from(0)
+
+    def _wrap_from(self, pos):
+        space = glyph_advance(self.font, " ")
+        line_start, words, line_w = None, [], 0
+        for m in _WORD.finditer(self.text, pos):
+            word = m.group()
+            w = text_width(self.font, word)
+            if words and line_w + w + space > self.width:
+                self._add_line(line_start, words)
+                line_start, words, line_w = None, [], 0
+            if line_start is None:
+                line_start = m.start()
+            words.append(word)
+            line_w += w + space
+        if words:
+            self._add_line(line_start, words)
+
+    def _add_line(self, start, words):
+        self._lines.append((start, " ".join(words)))
+        self._surfaces.append(None)
+
+    @property
+    def lines(self):
+        return [line for _, line in self._lines]
+
+    def content_height(self):
+        return len(self._lines) * self.line_height
+
+    def scroll(self, dy, view_height):
+        lowest = min(0, view_height - self.content_height())
+        self.scroll_y = max(lowest, min(0, self.scroll_y + dy))
+
+    def draw(self, surface, rect):
+        old_clip = surface.get_clip()
+        surface.set_clip(rect)
+        first = max(0, -self.scroll_y // self.line_height)
+        y = rect.y + self.scroll_y + first * self.line_height
+        for i in range(first, len(self._lines)):
+            if y >= rect.bottom:
+                break
+            if self._surfaces[i] is None:
+                self._surfaces[i] = self.font.render(self._lines[i][1], True, self.color)
+            surface.blit(self._surfaces[i], (rect.x, y))
+            y += self.line_height
+        surface.set_clip(old_clip)
@@ -0,0 +1,149 @@
+import io
+import os
+import queue
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pygame
+
+from snapshot_writer import write_atomic
+
+# ------------------ Plant Photo Thumbnails ------------------ #
+# Photos are whatever the user picked in the file dialog, often
+# multi-megabyte camera JPEGs, so they are never decoded on the UI thread.
+#  - get(path) returns a ready thumbnail or None. A miss queues the photo
+#    for the worker thread and returns immediately; the list draws a
+#    placeholder until it arrives.
+#  - The worker reads the file once, hashes the bytes and looks for
+#    "<hash>_<w>x<h>.png" in the disk cache. Only on a disk miss does it
+#    decode the full photo, scale it down and save the small PNG.
+#  - poll() runs on the UI thread once per frame: finished thumbnails are
+#    convert_alpha'd there (that needs the display) and go into a bounded
+#    LRU of surfaces.
+# Requests are served newest first, so rows the user just scrolled to
+# load before ones that have already scrolled away.
+
+THUMB_SIZE = (32, 32)
+CACHE_DIR = "thumbnails"
+MAX_SURFACES = 256
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def scale_to_fit(surface, size):
+    w, h = surface.get_size()
+    scale = min(size[0] / w, size[1] / h, 1.0)
+    target = (max(1, round(w * scale)), max(1, round(h * scale)))
+    if surface.get_bitsize() < 24:
+        # smoothscale only takes 24/32-bit surfaces (palette PNGs aren't)
+        rgba = pygame.Surface((w, h), pygame.SRCALPHA, 32)
+        rgba.blit(surface, (0, 0))
+        surface = rgba
+    return pygame.transform.smoothscale(surface, target)
+
+
+class ThumbnailService:
+    def __init__(self, cache_dir=CACHE_DIR, size=THUMB_SIZE, max_entries=MAX_SURFACES, wake=None):
+        self.cache_dir = cache_dir
+        self.size = size
+        self.max_entries = max_entries
+        self.wake = wake
+        self.version = 0        # bumped when a thumbnail becomes available
+        self.decoded = 0        # full photos decoded (disk cache misses)
+        self.disk_hits = 0
+        self._surfaces = OrderedDict()
+        self._failed = set()
+        self._pending = set()
+        self._requests = queue.LifoQueue()
+        self._results = queue.Queue()
+        self._hashes = {}       # (path, size, mtime) -> content hash, worker only
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    # --- UI thread --- #
+    def get(self, path):
+        if not path:
+            return None
+        surface = self._surfaces.get(path)
+        if surface is not None:
+            self._surfaces.move_to_end(path)
+            return surface
+        if path not in self._pending and path not in self._failed:
+            self._pending.add(path)
+            self._requests.put(path)
+        return None
+
+    def poll(self):
+        # move finished thumbnails into the LRU; True if any arrived
+        changed = False
+        while True:
+            try:
+                path, surface = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending.discard(path)
+            if surface is None:
+                self._failed.add(path)
+                continue
+            self._surfaces[path] = surface.convert_alpha()
+            self._surfaces.move_to_end(path)
+            while len(self._surfaces) > self.max_entries:
+                self._surfaces.popitem(last=False)
+            changed = True
+        if changed:
+            self.version += 1
+        return changed
+
+    def forget(self, path):
+        # e.g. after the photo file was replaced; the next get() reloads it
+        self._surfaces.pop(path, None)
+        self._failed.discard(path)
+
+    def stop(self):
+        self._requests.put(None)
+        self._thread.join()
+
+    # --- worker thread --- #
+    def _loop(self):
+        while True:
+            path = self._requests.get()
+            if path is None:
+                return
+            try:
+                surface = self._load(path)
+            except (OSError, pygame.error) as e:
+                print(f"Could not load photo {path}: {e}")
+                surface = None
+            self._results.put((path, surface))
+            if self.wake:
+                self.wake()
+
+    def _cache_path(self, digest):
+        return os.path.join(self.cache_dir, f"{digest}_{self.size[0]}x{self.size[1]}.png")
+
+    def _load(self, path):
+        st = os.stat(path)
+        stat_key = (path, st.st_size, st.st_mtime_ns)
+        digest = self._hashes.get(stat_key)
+        data = None
+        if digest is None:
+            with open(path, "rb") as f:
+                data = f.read()
+            digest = self._hashes[stat_key] = content_hash(data)
+        cached = self._cache_path(digest)
+        if os.path.exists(cached):
+            self.disk_hits += 1
+            return pygame.image.load(cached)
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        thumb = scale_to_fit(pygame.image.load(io.BytesIO(data), os.path.basename(path)), self.size)
+        self.decoded += 1
+        out = io.BytesIO()
+        pygame.image.save(thumb, out, "thumb.png")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        write_atomic(cached, out.getvalue())
+        return thumb
@@ -0,0 +1,91 @@
+import pygame
+
+# ------------------ Retained Layout + Hit Testing ------------------ #
+# A screen describes its widgets once, as a small tree of nodes with
+# rectangles, and only rebuilds that tree when its layout key changes
+# (e.g. the number of checklist rows). Drawing reads rectangles from the
+# tree and clicks are resolved against the same tree, so the geometry
+# lives in one place instead of being recomputed in the draw pass and
+# again in the event handler.
+#
+# Nodes with a target are registered in a uniform grid: a click only
+# checks the few rectangles overlapping its grid cell, however many
+# widgets the screen has. When rectangles overlap, the node added last
+# (drawn on top) wins.
+
+CELL_SIZE = 40
+
+
+class HitGrid:
+    def __init__(self, cell=CELL_SIZE):
+        self.cell = cell
+        self._cells = {}
+        self._order = 0
+
+    def clear(self):
+        self._cells.clear()
+        self._order = 0
+
+    def insert(self, rect, target):
+        entry = (self._order, rect, target)
+        self._order += 1
+        c = self.cell
+        for cx in range(rect.left // c, (rect.right - 1) // c + 1):
+            for cy in range(rect.top // c, (rect.bottom - 1) // c + 1):
+                self._cells.setdefault((cx, cy), []).append(entry)
+
+    def hit(self, pos):
+        best = None
+        for entry in self._cells.get((pos[0] // self.cell, pos[1] // self.cell), ()):
+            if entry[1].collidepoint(pos) and (best is None or entry[0] > best[0]):
+                best = entry
+        return best[2] if best else None
+
+
+class LayoutNode:
+    __slots__ = ("rect", "target", "children")
+
+    def __init__(self, rect, target=None, children=()):
+        self.rect = pygame.Rect(rect)
+        self.target = target
+        self.children = list(children)
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+class Layout:
+    # build(layout) returns the root LayoutNode; call update(key) each
+    # frame and the tree is only rebuilt when the key changes.
+    def __init__(self, build, cell=CELL_SIZE):
+        self._build = build
+        self._key = None
+        self._built = False
+        self.root = None
+        self.grid = HitGrid(cell)
+        self._by_target = {}
+        self.rebuilds = 0
+
+    def update(self, key=None):
+        if not self._built or key != self._key:
+            self._key, self._built = key, True
+            self.grid.clear()
+            self._by_target = {}
+            self.root = self._build(self)
+            for node in self.root.walk():
+                if node.target is not None:
+                    self.grid.insert(node.rect, node.target)
+                    self._by_target[node.target] = node
+            self.rebuilds += 1
+        return self
+
+    def node(self, rect, target=None, children=()):
+        return LayoutNode(rect, target, children)
+
+    def rect(self, target):
+        return self._by_target[target].rect
+
+    def hit(self, pos):
+        return self.grid.hit(pos)
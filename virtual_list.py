@@ -0,0 +1,100 @@
+import pygame
+
+# ------------------ Virtualized List ------------------ #
+# A scrollable list that only draws the rows inside its viewport, so the
+# cost of a frame depends on the viewport height, not the number of
+# items. Rows sit on a fixed pitch, which makes both "which rows are
+# visible" and "which row is under the mouse" simple arithmetic.
+#
+# Scroll with the mouse wheel or by dragging; a press that doesn't move
+# more than DRAG_THRESHOLD pixels counts as a click on that row.
+
+DRAG_THRESHOLD = 6
+WHEEL_STEP = 30
+
+
+class VirtualList:
+    def __init__(self, rect, row_height=40, row_pitch=50):
+        self.rect = pygame.Rect(rect)
+        self.row_height = row_height
+        self.row_pitch = row_pitch
+        self.items = []
+        self.scroll_y = 0
+        self._press = None      # (mouse y, scroll_y) at button down
+        self._dragging = False
+
+    def set_items(self, items):
+        self.items = items
+        self.clamp()
+
+    def content_height(self):
+        return max(0, len(self.items) * self.row_pitch - (self.row_pitch - self.row_height))
+
+    def max_scroll(self):
+        return max(0, self.content_height() - self.rect.h)
+
+    def clamp(self):
+        self.scroll_y = max(0, min(self.scroll_y, self.max_scroll()))
+
+    def scroll(self, dy):
+        self.scroll_y += dy
+        self.clamp()
+
+    def visible_range(self):
+        first = self.scroll_y // self.row_pitch
+        last = min(len(self.items), (self.scroll_y + self.rect.h) // self.row_pitch + 1)
+        return first, last
+
+    def row_rect(self, index):
+        return pygame.Rect(self.rect.x, self.rect.y + index * self.row_pitch - self.scroll_y,
+                           self.rect.w, self.row_height)
+
+    def index_at(self, pos):
+        if not self.rect.collidepoint(pos):
+            return None
+        offset = pos[1] - self.rect.y + self.scroll_y
+        index = offset // self.row_pitch
+        if offset % self.row_pitch >= self.row_height or index >= len(self.items):
+            return None    # in the gap between rows, or below the last one
+        return index
+
+    def draw(self, surface, draw_row):
+        # draw_row(surface, item, rect) is called for visible rows only
+        old_clip = surface.get_clip()
+        surface.set_clip(self.rect)
+        first, last = self.visible_range()
+        for i in range(first, last):
+            draw_row(surface, self.items[i], self.row_rect(i))
+        surface.set_clip(old_clip)
+        if self.max_scroll():
+            track = pygame.Rect(self.rect.right + 4, self.rect.y, 4, self.rect.h)
+            thumb_h = max(12, self.rect.h * self.rect.h // self.content_height())
+            thumb_y = track.y + (track.h - thumb_h) * self.scroll_y // self.max_scroll()
+            pygame.draw.rect(surface, (220, 220, 220), track, border_radius=2)
+            pygame.draw.rect(surface, (120, 120, 120), (track.x, thumb_y, track.w, thumb_h), border_radius=2)
+
+    def handle_event(self, e):
+        # returns the clicked item (on release, if it wasn't a drag), else None
+        if e.type == pygame.MOUSEWHEEL:
+            if self.rect.collidepoint(pygame.mouse.get_pos()):
+                self.scroll(-e.y * WHEEL_STEP)
+        elif e.type == pygame.MOUSEBUTTONDOWN and e.button == 1 and self.rect.collidepoint(e.pos):
+            self._press = (e.pos[1], self.scroll_y)
+            self._dragging = False
+        elif e.type == pygame.MOUSEMOTION and self._press is not None:
+            dy = e.pos[1] - self._press[0]
+            if self._dragging or abs(dy) > DRAG_THRESHOLD:
+                self._dragging = True
+                self.scroll_y = self._press[1] - dy
+                self.clamp()
+        elif e.type == pygame.MOUSEBUTTONUP and e.button == 1 and self._press is not None:
+            was_drag, self._press = self._dragging, None
+            self._dragging = False
+            if not was_drag:
+                index = self.index_at(e.pos)
+                if index is not None:
+                    return self.items[index]
+        return None
+
+    def dragging(self):
+        return self._dragging